@@ -1,50 +1,14 @@
 import argparse
+import time
 import cv2
 from recipify.preprocessing import preprocess_image
 from recipify.ocr import extract_text
 from recipify.extraction import parse_receipt_data
-from ultralytics import YOLO  # YOLOv11
-
-def load_yolo_model(weights_path):
-    """
-    Load the YOLOv11 model.
-    """
-    return YOLO(weights_path)
-
-def detect_receipt_elements(model, image_path):
-    """
-    Detects receipt elements using YOLOv11.
-
-    Args:
-        model: Loaded YOLOv11 model.
-        image_path (str): Path to the receipt image.
-
-    Returns:
-        list[dict]: Detected elements with labels and bounding boxes.
-    """
-    # Run inference
-    results = model(image_path)  # Returns a list of Results objects
-    
-    # Check if results are non-empty
-    if not results:
-        print("No detections.")
-        return []
-
-    # YOLOv11 returns a list; process the first result
-    result = results[0]
-    
-    detections = []
-    if hasattr(result, "boxes"):
-        for box in result.boxes:
-            detections.append({
-                "label": result.names[int(box.cls[0])],  # Class label
-                "confidence": box.conf[0].item(),        # Confidence score
-                "coordinates": box.xyxy[0].tolist()      # Bounding box coordinates
-            })
-    else:
-        print("No bounding boxes found in results.")
-    
-    return detections
+from recipify.config.pipeline import PipelineConfig
+from recipify.detection import load_yolo_model, detect_receipt_elements
+from recipify.pipeline import fill_from_regions, missing_fields
+from recipify.profiling import SamplingProfiler
+from recipify.triage import quality_metrics, receipt_score, route_config, triage
 
 def save_preprocessed_image(preprocessed_image, save_dir):
     """
@@ -59,36 +23,73 @@ def save_preprocessed_image(preprocessed_image, save_dir):
         cv2.imwrite(preprocessed_image_path, preprocessed_image)
         print(f"Preprocessed image saved at {preprocessed_image_path}")
 
-def main(image_path, yolo_weights, save_dir=None):
-    # Step 1: Preprocess the image
+def main(image_path, yolo_weights=None, save_dir=None, config_path=None, regions=False):
+    config = PipelineConfig.load(config_path) if config_path else PipelineConfig()
+
+    # Step 1: Load the image
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"Could not read image {image_path}")
+        return
+
+    # Step 2: Detect elements up front when region output was asked for,
+    # so triage can also use the detector's receipt score
+    model = load_yolo_model(yolo_weights) if yolo_weights else None
+    detections = None
+    if model is not None and regions:
+        print("Running YOLOv11 detection...")
+        start = time.perf_counter()
+        detections = detect_receipt_elements(model, image)
+        print(f"Detections ({time.perf_counter() - start:.2f}s): {detections}")
+
+    # Step 3: Triage image quality before spending time on OCR
+    metrics = quality_metrics(image)
+    route = triage(metrics, receipt_score(detections) if detections is not None else None)
+    print(f"Triage route: {route} {metrics}")
+    if route == "reject":
+        print("Image rejected by triage; skipping OCR.")
+        return
+
+    # Step 4: Preprocess the image
     print("Preprocessing the image...")
-    preprocessed_image = preprocess_image(image_path)
+    route_settings = route_config(route, config)
+    preprocessed_image = preprocess_image(image, route_settings)
     print("Preprocessed image created.")
 
-    # Step 2: Save the preprocessed image if save_dir is specified
+    # Step 5: Save the preprocessed image if save_dir is specified
     if save_dir:
         save_preprocessed_image(preprocessed_image, save_dir)
 
-    # Step 3: Detect elements using YOLO
-    print("Running YOLOv11 detection...")
-    model = load_yolo_model(yolo_weights)
-    detections = detect_receipt_elements(model, image_path)
-    print(f"Detections: {detections}")
-
-    # Step 4: Extract text using OCR
+    # Step 6: Extract text using OCR
     print("Running OCR...")
-    raw_text = extract_text(preprocessed_image)
+    raw_text = extract_text(preprocessed_image, route_settings)
     print(f"Raw OCR Text:\n{raw_text}")
 
-    if not raw_text.strip():  # If OCR text is empty
+    # Step 7: Parse receipt data
+    if raw_text.strip():
+        print("Extracting receipt data...")
+        extracted_data = parse_receipt_data(raw_text)
+    else:
         print("OCR did not extract any text from the image.")
-        return
+        extracted_data = {"error": "Empty receipt text"}
+
+    # Step 8: Detect elements using YOLO only if the text left gaps
+    fields = missing_fields(extracted_data)
+    if model is not None and fields:
+        if detections is None:
+            print(f"Running YOLOv11 detection (missing fields: {fields})...")
+            start = time.perf_counter()
+            detections = detect_receipt_elements(model, image)
+            print(f"Detections ({time.perf_counter() - start:.2f}s): {detections}")
+        extracted_data = fill_from_regions(image, detections, extracted_data, fields, config)
+    elif model is not None and detections is None:
+        print("Skipping YOLOv11 detection: total, date and vendor found in text.")
 
-    # Step 5: Parse receipt data
-    print("Extracting receipt data...")
-    extracted_data = parse_receipt_data(raw_text)
+    if "error" in extracted_data:
+        print(f"Could not extract receipt data: {extracted_data['error']}")
+        return
 
-    # Step 6: Display the extracted data
+    # Step 9: Display the extracted data
     print("\nDetected Shop:", extracted_data.get("vendor", "Unknown"))
     print("Total Amount:", extracted_data.get("total", "Unknown"))
     print("Date:", extracted_data.get("date", "Unknown"))
@@ -104,7 +105,18 @@ def main(image_path, yolo_weights, save_dir=None):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Receipt Scanner Demo")
     parser.add_argument("--image", type=str, required=True, help="Path to the receipt image")
-    parser.add_argument("--weights", type=str, required=True, help="Path to the YOLOv11 model weights")
+    parser.add_argument("--weights", type=str, help="Path to the YOLOv11 model weights, used when text alone misses fields (optional)")
     parser.add_argument("--save_dir", type=str, help="Directory to save the preprocessed image (optional)")
+    parser.add_argument("--config", type=str, help="Pipeline config written by recipify.tuning (optional)")
+    parser.add_argument("--regions", action="store_true", help="Always run detection and print region-level output")
+    parser.add_argument("--profile", type=str, help="Write a speedscope (or .folded) profile of the run to this path (optional)")
     args = parser.parse_args()
-    main(args.image, args.weights, args.save_dir)
+
+    if args.profile:
+        with SamplingProfiler() as profiler:
+            main(args.image, args.weights, args.save_dir, args.config, args.regions)
+        profiler.write(args.profile, name=args.image)
+        print(profiler.report())
+        print(f"Profile saved at {args.profile}")
+    else:
+        main(args.image, args.weights, args.save_dir, args.config, args.regions)
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, Field, validator
+
+THRESHOLD_METHODS = ("otsu", "adaptive", "none")
+
+class PipelineConfig(BaseModel):
+    """Preprocessing and OCR settings used by the receipt pipeline."""
+    blur_kernel: int = Field(default=3, ge=0)
+    threshold: str = "otsu"
+    close_kernel: int = Field(default=1, ge=1)
+    max_side: Optional[int] = Field(default=None, gt=0)
+    oem: int = 3
+    psm_modes: List[int] = Field(default_factory=lambda: [6, 11], min_length=1)
+
+    @validator('blur_kernel')
+    def validate_blur_kernel(cls, v: int) -> int:
+        """Gaussian kernels must be odd; 0 disables blurring."""
+        if v and v % 2 == 0:
+            raise ValueError(f"Blur kernel {v} must be odd")
+        return v
+
+    @validator('threshold')
+    def validate_threshold(cls, v: str) -> str:
+        """Validate the thresholding method is supported."""
+        if v not in THRESHOLD_METHODS:
+            raise ValueError(f"Threshold method must be one of {THRESHOLD_METHODS}")
+        return v
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PipelineConfig":
+        """
+        Load a configuration written by ``save`` or the tuning command.
+
+        Args:
+            path: Path to a JSON configuration file
+
+        Returns:
+            PipelineConfig: The loaded configuration
+        """
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the configuration as JSON.
+
+        Args:
+            path: Destination file
+        """
+        with open(path, "w") as f:
+            json.dump(self.dict(), f, indent=2)
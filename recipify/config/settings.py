@@ -1 +1,23 @@
- 
\ No newline at end of file
+import os
+import re
+from pathlib import Path
+
+from pydantic import BaseModel
+
+class Settings(BaseModel):
+    """Application settings, overridable with ``RECIPIFY_*`` environment variables."""
+    BASE_DIR: Path = Path(os.environ.get("RECIPIFY_BASE_DIR", Path(__file__).resolve().parents[2]))
+    LOG_LEVEL: str = os.environ.get("RECIPIFY_LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.environ.get(
+        "RECIPIFY_LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+class Patterns:
+    """Compiled regular expressions shared by the receipt parsers."""
+    TOTAL = re.compile(r"TOTAL\s*[:\-]?\s*\$?([\d.]+)", re.IGNORECASE)
+    DATE = re.compile(r"\d{2}/\d{2}/\d{2}")
+    TIME = re.compile(r"\d{2}:\d{2}")
+    QUANTITY = re.compile(r"(\w+)\s+(\d+)\s+X\s+([\d.]+)")
+
+settings = Settings()
+patterns = Patterns()
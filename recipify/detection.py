@@ -0,0 +1,45 @@
+from ultralytics import YOLO  # YOLOv11
+
+from recipify.profiling import profiled_stage
+
+def load_yolo_model(weights_path):
+    """
+    Load the YOLOv11 model.
+    """
+    return YOLO(weights_path)
+
+@profiled_stage("detect")
+def detect_receipt_elements(model, image):
+    """
+    Detects receipt elements using YOLOv11.
+
+    Args:
+        model: Loaded YOLOv11 model.
+        image: Path to the receipt image, or an already decoded BGR image.
+
+    Returns:
+        list[dict]: Detected elements with labels and bounding boxes.
+    """
+    # Run inference
+    results = model(image)  # Returns a list of Results objects
+
+    # Check if results are non-empty
+    if not results:
+        print("No detections.")
+        return []
+
+    # YOLOv11 returns a list; process the first result
+    result = results[0]
+
+    detections = []
+    if hasattr(result, "boxes"):
+        for box in result.boxes:
+            detections.append({
+                "label": result.names[int(box.cls[0])],  # Class label
+                "confidence": box.conf[0].item(),        # Confidence score
+                "coordinates": box.xyxy[0].tolist()      # Bounding box coordinates
+            })
+    else:
+        print("No bounding boxes found in results.")
+
+    return detections
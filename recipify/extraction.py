@@ -1,13 +1,14 @@
 import re
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 from pydantic import BaseModel, Field, validator
 
 from recipify.config.settings import settings, patterns
+from recipify.profiling import profiled_stage
 from recipify.utils.logging import setup_logging
 
 # Configure logging
@@ -22,9 +23,92 @@ PATTERNS = {
     'total': re.compile(r"TOTAL\s*[:\-]?\s*\$?([\d.]+)", re.IGNORECASE),
     'date': re.compile(r"\d{2}/\d{2}/\d{2}"),
     'time': re.compile(r"\d{2}:\d{2}"),
-    'items': re.compile(r"([A-Za-z0-9 ]+)\s+([\d.]+)")
+    'price': re.compile(r"\$?(\d{0,5}\.\d{2})[A-Z*]{0,2}"),
+    'item_name': re.compile(r"[\w .,'\"#%&*@/\\()+-]+"),
+    'non_item': re.compile(
+        r"\b(?:SUB\s*TOTAL|TOTAL(?:\s+(?:TAX|DUE|PURCHASE|SALE))?"
+        r"|TAX(?:\s*\d+)?(?:\s+\d+(?:\.\d+)?\s*%)?|CHANGE(?:\s+DUE)?|(?:AMOUNT|BALANCE)(?:\s+DUE)?"
+        r"|(?:CASH|DEBIT|CREDIT|VISA|MASTERCARD|MC|AMEX|DISCOVER|EBT|US\s+DEBIT)"
+        r"(?:\s+(?:TEND(?:ERED)?|DUE|CARD|PURCHASE))?)(?!\w)\W*",
+        re.IGNORECASE,
+    ),
+    # Tax and department flags printed after the price ("5.48 N", "3.99 *")
+    'flag': re.compile(r"[A-Z]{1,2}|\*|0"),
+    # UPC / item codes, sometimes with a weighed-item suffix ("000000004011KF")
+    'item_code': re.compile(r"\d{5,}[A-Z]{0,2}"),
 }
 
+# OCR noise can produce very long garbage lines; anything longer than this
+# is not an item line and is skipped without being inspected.
+MAX_ITEM_LINE_LENGTH = 120
+
+# At most this many trailing flag tokens are stripped before the price.
+MAX_FLAG_TOKENS = 2
+
+def _item_name(tokens: List[str]) -> str:
+    """
+    Build an item name from the tokens before the price.
+
+    The name is what precedes the first item code; when nothing readable
+    does (Costco prints ``E 6333561 KS DICED TOM``), what follows it is used.
+    Item codes and a single-letter tax flag left before the price are dropped.
+    """
+    codes = [i for i, token in enumerate(tokens) if PATTERNS['item_code'].fullmatch(token)]
+    if codes:
+        before, after = tokens[:codes[0]], tokens[codes[0] + 1:]
+        if any(sum(c.isalpha() for c in token) >= 2 for token in before):
+            tokens = before
+        else:
+            tokens = [token for token in after if not PATTERNS['item_code'].fullmatch(token)]
+            if tokens and len(tokens[-1]) == 1 and tokens[-1].isalpha():
+                tokens = tokens[:-1]
+    return " ".join(tokens).strip(" *.")
+
+def parse_item_lines(text: str, max_line_length: int = MAX_ITEM_LINE_LENGTH) -> List[Tuple[str, float]]:
+    """
+    Extract ``(name, price)`` pairs from receipt text, one per line.
+
+    Each line is split into whitespace tokens; up to ``MAX_FLAG_TOKENS``
+    trailing tax flags are dropped and the last remaining token is accepted
+    as the price only if it looks like a money amount. Every step is a
+    bounded scan of a single line, so the cost is linear in the size of the
+    text regardless of how noisy the OCR output is.
+
+    Args:
+        text: OCR-extracted text from receipt image
+        max_line_length: Lines longer than this are ignored
+
+    Returns:
+        List of (item name, price) tuples in receipt order
+    """
+    items = []
+    for line in text.splitlines():
+        if len(line) > max_line_length:
+            continue
+
+        tokens = line.split()
+        for _ in range(MAX_FLAG_TOKENS):
+            if len(tokens) > 2 and PATTERNS['flag'].fullmatch(tokens[-1]):
+                tokens.pop()
+        if len(tokens) < 2:
+            continue
+
+        price_match = PATTERNS['price'].fullmatch(tokens[-1])
+        if not price_match:
+            continue
+
+        name = _item_name(tokens[:-1])
+        if not PATTERNS['item_name'].fullmatch(name) or not any(c.isalpha() for c in name):
+            continue
+        if PATTERNS['non_item'].fullmatch(name):
+            continue
+
+        price = float(price_match.group(1))
+        if price > 0:
+            items.append((name, price))
+
+    return items
+
 class ReceiptItem(BaseModel):
     """Model for receipt items with validation."""
     name: str = Field(..., min_length=1)
@@ -111,14 +195,11 @@ class WalmartReceiptParser(BaseReceiptParser):
             self._extract_datetime()
             
             # Extract items
-            items = patterns.ITEMS.findall(self.text)
+            items = parse_item_lines(self.text)
             if items:
                 self.data.items = [
-                    ReceiptItem(
-                        name=item[0].strip(),
-                        price=float(item[1])
-                    )
-                    for item in items
+                    ReceiptItem(name=name, price=price)
+                    for name, price in items
                 ]
             
             return self.data
@@ -156,8 +237,8 @@ class CafeteriaReceiptParser(BaseReceiptParser):
                 ]
             
             # Extract metadata
-            for field in ["order_type", "order_status"]:
-                match = re.search(f"{field}:\s*(.*)", self.text, re.IGNORECASE)
+            for field, label in [("order_type", r"Order\s*Type"), ("order_status", r"Order\s*Status")]:
+                match = re.search(rf"{label}:\s*(.*)", self.text, re.IGNORECASE)
                 if match:
                     self.data.metadata[field] = match.group(1).strip()
             
@@ -208,6 +289,7 @@ def get_receipt_parser(text: str) -> BaseReceiptParser:
         logger.warning("Unknown receipt type, using default parser")
         return BaseReceiptParser(text)
 
+@profiled_stage("parse")
 def parse_receipt_data(text: str) -> Dict[str, Any]:
     """
     Main function to parse receipt data.
@@ -219,12 +301,13 @@ def parse_receipt_data(text: str) -> Dict[str, Any]:
         Parsed receipt data as dictionary
         
     Raises:
-        ReceiptParsingError: If parsing fails
+        ValueError: If the text is empty; callers should skip OCR output
+            with no text rather than parse it
     """
+    if not text.strip():
+        raise ValueError("Empty receipt text")
+
     try:
-        if not text.strip():
-            raise ValueError("Empty receipt text")
-            
         parser = get_receipt_parser(text)
         receipt_data = parser.parse()
         
@@ -272,9 +355,9 @@ def parse_walmart_receipt(text):
             data["time"] = time_match.group(0)
 
         # Extract items
-        items = re.findall(r"([A-Za-z0-9 ]+)\s+([\d.]+)", text)
+        items = parse_item_lines(text)
         if items:
-            data["items"] = [{"name": item[0].strip(), "price": float(item[1])} for item in items]
+            data["items"] = [{"name": name, "price": price} for name, price in items]
 
     except Exception as e:
         data["error"] = f"Error parsing Walmart receipt: {e}"
@@ -365,10 +448,10 @@ def parse_trader_joes_receipt(text):
         if time_match:
             data["time"] = time_match.group(0)
 
-        # Extract items (simplified pattern for Trader Joe's)
-        items = re.findall(r"([A-Za-z0-9 ]+)\s+([\d.]+)", text)
+        # Extract items
+        items = parse_item_lines(text)
         if items:
-            data["items"] = [{"name": item[0].strip(), "price": float(item[1])} for item in items]
+            data["items"] = [{"name": name, "price": price} for name, price in items]
 
     except Exception as e:
         data["error"] = f"Error parsing Trader Joe's receipt: {e}"
@@ -1,6 +1,9 @@
 import pytesseract
 import re
 
+from recipify.config.pipeline import PipelineConfig
+from recipify.profiling import stage
+
 def detect_total_amount(text):
     """
     Check if the total amount can be extracted from the OCR text.
@@ -16,37 +19,37 @@ def detect_total_amount(text):
         return float(total_match.group(1))
     return None
 
-def extract_text(image):
+def extract_text(image, config=None):
     """
     Extracts text from the preprocessed image using OCR with dynamic PSM selection.
+
+    PSM modes are tried in the order given by the config and the first one
+    whose text contains a total amount is used, so later modes only run when
+    the earlier ones miss the total.
     
     Args:
         image: A preprocessed image.
+        config: Optional PipelineConfig; defaults to PSM 6 then PSM 11.
     
     Returns:
         str: The extracted text.
     """
+    config = config or PipelineConfig()
     try:
-        # Try PSM 6
-        custom_config_psm6 = r'--oem 3 --psm 6'
-        text_psm6 = pytesseract.image_to_string(image, lang='eng', config=custom_config_psm6)
-        total_psm6 = detect_total_amount(text_psm6)
+        texts = []
+        for psm in config.psm_modes:
+            custom_config = f'--oem {config.oem} --psm {psm}'
+            with stage(f"ocr_psm{psm}"):
+                text = pytesseract.image_to_string(image, lang='eng', config=custom_config)
 
-        # Try PSM 11
-        custom_config_psm11 = r'--oem 3 --psm 11'
-        text_psm11 = pytesseract.image_to_string(image, lang='eng', config=custom_config_psm11)
-        total_psm11 = detect_total_amount(text_psm11)
+            # Choose the PSM mode based on which successfully extracts the total
+            if detect_total_amount(text) is not None:
+                print(f"Using PSM {psm} because total amount was detected.")
+                return text
+            texts.append(text)
 
-        # Choose the PSM mode based on which successfully extracts the total
-        if total_psm6 is not None:
-            print("Using PSM 6 because total amount was detected.")
-            return text_psm6
-        elif total_psm11 is not None:
-            print("Using PSM 11 because total amount was detected.")
-            return text_psm11
-        else:
-            print("No total amount detected in either PSM mode.")
-            return text_psm6  # Fallback to PSM 6 if both fail
+        print("No total amount detected in any PSM mode.")
+        return texts[0]  # Fallback to the first PSM mode if all fail
 
     except Exception as e:
         raise RuntimeError(f"Error in extract_text: {e}")
@@ -0,0 +1,528 @@
+import logging
+import multiprocessing
+import queue
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+from recipify.config.pipeline import PipelineConfig
+from recipify.extraction import parse_receipt_data
+from recipify.ocr import extract_text
+from recipify.preprocessing import preprocess_image
+from recipify.profiling import SamplingProfiler
+from recipify.scheduling import StagePlan, apply_thread_budget, plan_stages, thread_budget
+from recipify.transport import SharedImageTransport
+from recipify.triage import TriageThresholds, quality_metrics, receipt_score, route_config, triage
+from recipify.tuning import AMOUNT_PATTERN, DATE_PATTERN
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PipelineStats:
+    """Counters and queue depth samples collected during a pipeline run."""
+    plan: Dict[str, StagePlan] = field(default_factory=dict)
+    counters: Counter = field(default_factory=Counter)
+    queue_depths: Dict[str, List[int]] = field(default_factory=dict)
+    detect_times: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def sample_queues(self, queues: Dict[str, Any]) -> None:
+        """Record the current depth of each stage inbox."""
+        for name, stage_queue in queues.items():
+            try:
+                depth = stage_queue.qsize()
+            except NotImplementedError:  # macOS has no sem_getvalue
+                return
+            self.queue_depths.setdefault(name, []).append(depth)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarise the run as plain data for logging or printing."""
+        return {
+            "plan": {name: vars(plan) for name, plan in self.plan.items()},
+            "counters": dict(self.counters),
+            "queue_depths": {
+                name: {"mean": sum(depths) / len(depths), "max": max(depths)}
+                for name, depths in self.queue_depths.items()
+                if depths
+            },
+            "detection": self.detection_summary(),
+            "elapsed": self.elapsed,
+        }
+
+    def detection_summary(self) -> Dict[str, float]:
+        """
+        Report how often on-demand detection was skipped.
+
+        The time saved is estimated from the mean latency of the detections
+        that did run.
+        """
+        run = self.counters["detect_run"]
+        skipped = self.counters["detect_skipped"]
+        mean_latency = sum(self.detect_times) / len(self.detect_times) if self.detect_times else 0.0
+        return {
+            "run": run,
+            "skipped": skipped,
+            "skip_rate": skipped / (run + skipped) if run + skipped else 0.0,
+            "mean_latency": mean_latency,
+            "saved_seconds": skipped * mean_latency,
+        }
+
+REQUIRED_FIELDS = ("total", "date", "vendor")
+
+# Detector classes whose boxes hold each required field.
+FIELD_LABELS = {"vendor": "shop", "total": "total", "date": "date_time"}
+
+# Date layouts tried, in order, on a region's date once separators are
+# normalised to "/"; US month-first layouts win when ambiguous.
+DATE_FORMATS = ("%m/%d/%y", "%m/%d/%Y", "%Y/%m/%d", "%d/%m/%Y", "%d/%m/%y")
+
+def _parse_date(text: str) -> Optional[datetime]:
+    """Parse the first date in ``text`` in any layout of ``DATE_PATTERN``."""
+    date_match = DATE_PATTERN.search(text)
+    if not date_match:
+        return None
+    value = re.sub(r"[.\-]", "/", date_match.group(0))
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    logger.warning(f"Failed to parse date from region: {date_match.group(0)}")
+    return None
+
+def missing_fields(data: Dict[str, Any], required=REQUIRED_FIELDS) -> List[str]:
+    """
+    List required fields that text-only parsing did not recover reliably.
+
+    A field counts as missing when it is absent or a placeholder, and the
+    total is also treated as low-confidence when it is smaller than the sum
+    of the parsed items.
+    """
+    missing = []
+    if "total" in required:
+        total = data.get("total") or 0.0
+        items_sum = sum(item.get("price", 0) * item.get("quantity", 1) for item in data.get("items") or [])
+        if total <= 0 or total + 0.01 < items_sum:
+            missing.append("total")
+    if "date" in required and not data.get("date"):
+        missing.append("date")
+    if "vendor" in required and data.get("vendor") in (None, "", "Unknown"):
+        missing.append("vendor")
+    return missing
+
+def fill_from_regions(
+    image: Any,
+    detections: List[dict],
+    data: Dict[str, Any],
+    fields: List[str],
+    config: Optional[PipelineConfig] = None,
+) -> Dict[str, Any]:
+    """
+    OCR the detected box of each missing field and merge what it yields.
+
+    Args:
+        image: Decoded BGR image the detections refer to.
+        detections: Output of ``detect_receipt_elements``.
+        data: Parsed receipt data from the full-page text.
+        fields: Fields to recover, see ``missing_fields``.
+        config: Optional PipelineConfig; regions are read as single lines.
+
+    Returns:
+        dict: ``data`` with recovered fields filled in and listed under
+        ``recovered_fields``; unchanged if nothing was recovered.
+    """
+    config = (config or PipelineConfig()).copy(update={"psm_modes": [7]})
+    best: Dict[str, dict] = {}
+    for detection in detections:
+        label = detection.get("label")
+        if label not in best or detection["confidence"] > best[label]["confidence"]:
+            best[label] = detection
+
+    recovered: Dict[str, Any] = {}
+    for name in fields:
+        detection = best.get(FIELD_LABELS[name])
+        if detection is None:
+            continue
+        x1, y1, x2, y2 = (int(v) for v in detection["coordinates"])
+        crop = image[max(y1 - 4, 0):y2 + 4, max(x1 - 4, 0):x2 + 4]
+        if crop.size == 0:
+            continue
+        text = extract_text(preprocess_image(crop, config), config)
+
+        if name == "total":
+            amounts = AMOUNT_PATTERN.findall(text)
+            if amounts:
+                recovered["total"] = float(amounts[-1].replace(",", "."))
+        elif name == "date":
+            date = _parse_date(text)
+            if date is not None:
+                recovered["date"] = date
+        elif text.strip():
+            recovered["vendor"] = " ".join(text.split())
+
+    if not recovered:
+        return data
+    filled = {key: value for key, value in data.items() if key != "error"}
+    filled.update(recovered)
+    filled["recovered_fields"] = list(recovered)
+    return filled
+
+def _detect_worker(inbox, results, transport, yolo_weights, config, threads):
+    """
+    Run on-demand YOLO detection until a ``None`` sentinel arrives, filling
+    missing fields from the detected regions.
+    """
+    apply_thread_budget(threads)
+    from recipify.detection import detect_receipt_elements, load_yolo_model
+
+    model = load_yolo_model(yolo_weights)
+    for index, handle, data, fields in iter(inbox.get, None):
+        try:
+            image = transport.attach(handle)
+            start = time.perf_counter()
+            detections = detect_receipt_elements(model, image)
+            results.put((index, "detect_time", time.perf_counter() - start))
+            if fields:
+                results.put((index, "data", fill_from_regions(image, detections, data, fields, config)))
+            results.put((index, "detections", detections))
+        except Exception as e:
+            results.put((index, "detections", {"error": f"Error in detection: {e}"}))
+        finally:
+            image = None
+            transport.release(handle)
+
+def _preprocess_worker(inbox, outbox, results, transport, config, thresholds, threads):
+    """
+    Triage and preprocess decoded images and hand the result to the OCR
+    stage. Rejected images never reach OCR.
+    """
+    apply_thread_budget(threads)
+    for index, handle in iter(inbox.get, None):
+        try:
+            route = "heavy"
+            if thresholds is not None:
+                route = triage(quality_metrics(transport.attach(handle)), thresholds=thresholds)
+            results.put((index, "route", route))
+            if route == "reject":
+                results.put((index, "data", {"error": "Rejected by image-quality triage"}))
+                continue
+            processed = preprocess_image(transport.attach(handle), route_config(route, config))
+            outbox.put((index, transport.put(processed), route))
+        except Exception as e:
+            results.put((index, "data", {"error": str(e)}))
+        finally:
+            transport.release(handle)
+
+def _ocr_worker(inbox, results, transport, config, threads):
+    """Run OCR and parsing on preprocessed images."""
+    apply_thread_budget(threads)
+    for index, handle, route in iter(inbox.get, None):
+        try:
+            text = extract_text(transport.attach(handle), route_config(route, config))
+            results.put((index, "text", text))
+            results.put((index, "data", parse_receipt_data(text) if text.strip() else {"error": "Empty receipt text"}))
+        except Exception as e:
+            results.put((index, "data", {"error": str(e)}))
+        finally:
+            transport.release(handle)
+
+def process_receipt(
+    image: Any,
+    config: Optional[PipelineConfig] = None,
+    model: Any = None,
+    thresholds: Optional[TriageThresholds] = TriageThresholds(),
+    regions: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run every stage for one decoded image in the calling process.
+
+    Detection is on demand: the text is parsed first and the detector only
+    runs when a required field is missing or implausible. When ``regions``
+    asks for region-level output the detector runs anyway, so it runs first
+    and its receipt score is also used by triage.
+
+    Args:
+        image: Decoded BGR image.
+        config: Optional PipelineConfig for preprocessing and OCR.
+        model: Optional loaded YOLO model; detection never runs without it.
+        thresholds: Image-quality triage limits; ``None`` disables triage.
+        regions: Always run detection and return its boxes.
+
+    Returns:
+        dict: ``data`` and ``route``, plus ``text``, ``detections`` and
+        ``detect_time`` when those stages ran and ``detect_skipped`` when
+        a model was given but not needed.
+    """
+    config = config or PipelineConfig()
+    result: Dict[str, Any] = {}
+
+    def detect():
+        from recipify.detection import detect_receipt_elements
+
+        start = time.perf_counter()
+        result["detections"] = detect_receipt_elements(model, image)
+        result["detect_time"] = time.perf_counter() - start
+
+    if model is not None and regions:
+        detect()
+
+    route = "heavy"
+    if thresholds is not None:
+        score = receipt_score(result["detections"]) if "detections" in result else None
+        route = triage(quality_metrics(image), score, thresholds)
+    result["route"] = route
+    if route == "reject":
+        result["data"] = {"error": "Rejected by image-quality triage"}
+        return result
+
+    route_settings = route_config(route, config)
+    text = extract_text(preprocess_image(image, route_settings), route_settings)
+    result["text"] = text
+    result["data"] = parse_receipt_data(text) if text.strip() else {"error": "Empty receipt text"}
+
+    if model is None:
+        return result
+
+    fields = missing_fields(result["data"])
+    if not fields and "detections" not in result:
+        result["detect_skipped"] = True
+        return result
+
+    if "detections" not in result:
+        detect()
+    if fields:
+        result["data"] = fill_from_regions(image, result["detections"], result["data"], fields, config)
+    return result
+
+def run_pipeline(
+    image_paths: List[str],
+    yolo_weights: Optional[str] = None,
+    config: Optional[PipelineConfig] = None,
+    queue_size: int = 8,
+    cores: Optional[int] = None,
+    plan: Optional[Dict[str, StagePlan]] = None,
+    stats: Optional[PipelineStats] = None,
+    thresholds: Optional[TriageThresholds] = TriageThresholds(),
+    profile: Optional[str] = None,
+    profile_every: int = 100,
+    profile_top: int = 15,
+    regions: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Process receipt images with preprocessing, OCR and on-demand detection
+    in separate worker processes.
+
+    The calling process decodes each image once into shared memory; the
+    queues between stages only carry ``ImageHandle`` objects, so no image is
+    pickled. Each image is triaged on cheap quality metrics first: hopeless
+    ones are rejected before preprocessing and clean ones are preprocessed
+    at reduced resolution and get single-pass OCR (see ``route_config``).
+    Detection runs after OCR here, so unlike ``process_receipt`` with
+    ``regions``, triage never sees the detector's receipt score. Once the OCR text is parsed, the decoded image is sent to the
+    detector only if a required field is missing (see ``missing_fields``)
+    or ``regions`` is set. Worker counts and per-worker thread limits come
+    from ``plan_stages`` so that Torch and Tesseract together do not use
+    more threads than there are cores.
+
+    Args:
+        image_paths: Receipt images to process.
+        yolo_weights: Optional YOLO weights; detection never runs without them.
+        config: Optional PipelineConfig for preprocessing and OCR.
+        queue_size: Maximum handles waiting between two stages.
+        cores: Cores to schedule over; defaults to all available cores.
+        plan: Explicit per-stage plan, overriding ``cores``.
+        stats: Optional PipelineStats filled with the plan, counters, queue
+            depths and detection skip metrics of this run.
+        thresholds: Image-quality triage limits; ``None`` sends every image
+            down the heavy OCR path.
+        profile: Path for a speedscope (or ``.folded``) profile. Every
+            ``profile_every``-th image is then processed in the calling
+            process under a SamplingProfiler instead of by the workers, and
+            a summary of the ``profile_top`` hotspots is printed. Profiled
+            images run with the OCR workers' thread budget, but they still
+            differ from production: every stage shares that one budget, the
+            calling process loads its own YOLO model, and no new images are
+            fed to the workers while a profiled one runs.
+        profile_every: Sampling rate for profiled images.
+        profile_top: Number of hotspots in the printed summary.
+        regions: Run detection on every image that passes triage.
+
+    Returns:
+        list[dict]: One result per image, in input order, with ``image_path``,
+        ``data`` and, when available, ``route``, ``text``, ``detections`` and
+        ``detect_skipped``.
+
+    Raises:
+        RuntimeError: If a worker process dies; the remaining workers are
+            terminated and leftover shared images are unlinked.
+    """
+    config = config or PipelineConfig()
+    plan = plan or plan_stages(cores, detect=bool(yolo_weights))
+    stats = stats if stats is not None else PipelineStats()
+    stats.plan = plan
+    start = time.perf_counter()
+
+    transport = SharedImageTransport()
+    inboxes = {
+        "preprocess": multiprocessing.Queue(queue_size),
+        "ocr": multiprocessing.Queue(queue_size),
+    }
+    if yolo_weights:
+        inboxes["detect"] = multiprocessing.Queue(queue_size)
+    results_queue = multiprocessing.Queue()
+
+    targets = {
+        "preprocess": (
+            _preprocess_worker,
+            (inboxes["preprocess"], inboxes["ocr"], results_queue, transport, config, thresholds),
+        ),
+        "ocr": (_ocr_worker, (inboxes["ocr"], results_queue, transport, config)),
+    }
+    if yolo_weights:
+        targets["detect"] = (_detect_worker, (inboxes["detect"], results_queue, transport, yolo_weights, config))
+
+    workers = []
+    for name, (target, args) in targets.items():
+        for _ in range(plan[name].workers):
+            workers.append(multiprocessing.Process(target=target, args=args + (plan[name].threads,)))
+    for worker in workers:
+        worker.start()
+
+    profiler = SamplingProfiler() if profile else None
+    profile_model = None
+
+    results = [{"image_path": path} for path in image_paths]
+    # Decoded images kept alive until parsing decides whether to detect.
+    held: Dict[int, Any] = {}
+    detecting = set()
+    pending = 0
+
+    def finish(index):
+        nonlocal pending
+        pending -= 1
+        stats.counters["completed"] += 1
+
+    def handle_result(index, key, value):
+        if key == "detect_time":
+            stats.detect_times.append(value)
+            return
+        results[index][key] = value
+        if key == "route":
+            stats.counters[f"route_{value}"] += 1
+        elif key == "detections":
+            detecting.discard(index)
+            finish(index)
+        elif key == "data" and index not in detecting:
+            handle = held.pop(index, None)
+            rejected = results[index].get("route") == "reject"
+            fields = missing_fields(value)
+            if handle is not None and not rejected and (fields or regions):
+                detecting.add(index)
+                stats.counters["detect_run"] += 1
+                submit(inboxes["detect"], (index, handle, value, fields))
+                return
+            if handle is not None:
+                transport.release(handle)
+                if not rejected:
+                    results[index]["detect_skipped"] = True
+                    stats.counters["detect_skipped"] += 1
+            finish(index)
+
+    def check_workers():
+        if not all(worker.is_alive() for worker in workers):
+            raise RuntimeError("A pipeline worker exited unexpectedly")
+
+    def submit(stage_queue, item):
+        # A plain put would block forever on a full inbox once the workers
+        # draining it have died.
+        while True:
+            try:
+                stage_queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                check_workers()
+
+    def collect(block):
+        while pending and (block or not results_queue.empty()):
+            stats.sample_queues(inboxes)
+            try:
+                index, key, value = results_queue.get(timeout=1.0)
+            except queue.Empty:
+                check_workers()
+                continue
+            handle_result(index, key, value)
+            block = False
+
+    try:
+        for index, path in enumerate(image_paths):
+            pending += 1
+            image = cv2.imread(path)
+            if image is None:
+                results[index]["data"] = {"error": f"Could not read image {path}"}
+                pending -= 1
+                stats.counters["unreadable"] += 1
+                continue
+
+            if profiler is not None and index % profile_every == 0:
+                if yolo_weights and profile_model is None:
+                    from recipify.detection import load_yolo_model
+
+                    profile_model = load_yolo_model(yolo_weights)
+                profiler.start()
+                try:
+                    with thread_budget(plan["ocr"].threads):
+                        results[index].update(process_receipt(image, config, profile_model, thresholds, regions))
+                except Exception as e:
+                    results[index]["data"] = {"error": str(e)}
+                finally:
+                    profiler.stop()
+                if "route" in results[index]:
+                    stats.counters[f"route_{results[index]['route']}"] += 1
+                if "detect_time" in results[index]:
+                    stats.detect_times.append(results[index].pop("detect_time"))
+                    stats.counters["detect_run"] += 1
+                elif results[index].get("detect_skipped"):
+                    stats.counters["detect_skipped"] += 1
+                stats.counters["profiled"] += 1
+                finish(index)
+                continue
+
+            if yolo_weights:
+                held[index] = handle = transport.put(image, refs=2)
+            else:
+                handle = transport.put(image)
+            submit(inboxes["preprocess"], (index, handle))
+            collect(block=False)
+
+        while pending:
+            collect(block=True)
+
+        for name, inbox in inboxes.items():
+            for _ in range(plan[name].workers):
+                submit(inbox, None)
+    except BaseException:
+        # Sentinels could block on inboxes nobody drains any more, so stop
+        # the workers outright; whatever they held is unlinked by cleanup.
+        for worker in workers:
+            worker.terminate()
+        for inbox in inboxes.values():
+            inbox.cancel_join_thread()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+        transport.cleanup()
+        stats.elapsed = time.perf_counter() - start
+
+    if profiler is not None:
+        profiler.write(profile, name=f"recipify pipeline ({stats.counters['profiled']} receipts)")
+        print(profiler.report(profile_top))
+        print(f"Profile saved at {profile}")
+
+    logger.info(f"Pipeline stats: {stats.summary()}")
+    return results
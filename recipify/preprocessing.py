@@ -1,36 +1,56 @@
 import cv2
 import numpy as np
 
-def preprocess_image(image_path):
+from recipify.config.pipeline import PipelineConfig
+from recipify.profiling import profiled_stage
+
+@profiled_stage("preprocess")
+def preprocess_image(image_path, config=None):
     """
     Preprocesses the receipt image for OCR.
 
     Args:
-      image_path: Path to the receipt image.
+      image_path: Path to the receipt image, or an already decoded BGR image.
+      config: Optional PipelineConfig; defaults reproduce the original
+        3x3 blur, Otsu threshold and 1x1 close.
 
     Returns:
       A preprocessed image.
     """
+    config = config or PipelineConfig()
     try:
         # 1. Load the image
-        image = cv2.imread(image_path)
+        if isinstance(image_path, np.ndarray):
+            image = image_path
+        else:
+            image = cv2.imread(image_path)
 
         # 2. Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-        # 3. Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (3, 3), 1)
-
-        # 4. Use Adaptive Thresholding or Otsu's Binarization
-        # Try adaptive thresholding
-        #binary = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                       #cv2.THRESH_BINARY, 11, 2)
-
-        # Alternatively, you can use Otsu's method if adaptive thresholding doesn't work well
-        _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-        # 5. Use morphology to enhance text regions
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 1))
+        # 3. Downscale large photos so the long side fits max_side
+        if config.max_side:
+            scale = config.max_side / max(gray.shape[:2])
+            if scale < 1:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # 4. Apply Gaussian blur to reduce noise
+        if config.blur_kernel:
+            blurred = cv2.GaussianBlur(gray, (config.blur_kernel, config.blur_kernel), 1)
+        else:
+            blurred = gray
+
+        # 5. Use Adaptive Thresholding or Otsu's Binarization
+        if config.threshold == "adaptive":
+            binary = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                           cv2.THRESH_BINARY, 11, 2)
+        elif config.threshold == "otsu":
+            _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        else:
+            binary = blurred
+
+        # 6. Use morphology to enhance text regions
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (config.close_kernel, config.close_kernel))
         processed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
 
         return processed
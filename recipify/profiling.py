@@ -0,0 +1,200 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from types import CodeType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Innermost-last stack of stage names for every thread that has entered one.
+_stages: Dict[int, List[str]] = {}
+
+OTHER_STAGE = "other"
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Mark the code inside the block as belonging to a pipeline stage.
+
+    Samples taken by ``SamplingProfiler`` while the block runs are attributed
+    to ``name``. Outside a profile this only pushes and pops a list entry.
+    """
+    stack = _stages.setdefault(threading.get_ident(), [])
+    stack.append(name)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+def profiled_stage(name: str) -> Callable:
+    """Decorator form of ``stage`` for whole functions."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_stage(thread_id: Optional[int] = None) -> str:
+    """Return the innermost stage of a thread, or ``"other"``."""
+    stack = _stages.get(thread_id or threading.get_ident())
+    return stack[-1] if stack else OTHER_STAGE
+
+def _frame_name(code: CodeType) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for a single thread.
+
+    A background thread wakes every ``interval`` seconds and records the
+    target thread's Python stack together with its current ``stage``. Time
+    spent waiting on Tesseract subprocesses shows up under the pytesseract
+    frames that wait for them, and C-level work (Torch, regex, Pydantic
+    core) is charged to the Python frame that called it.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Args:
+            interval: Seconds between samples.
+            thread_id: Thread to sample; defaults to the one calling ``start``.
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: List[Tuple[str, Tuple[CodeType, ...], float]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        """Start (or resume) sampling."""
+        if self._thread is not None:
+            return self
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="recipify-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        """Stop sampling; samples collected so far are kept."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                self.samples.append((current_stage(self.thread_id), tuple(stack), elapsed))
+
+    @property
+    def total_time(self) -> float:
+        return sum(weight for _, _, weight in self.samples)
+
+    def stage_times(self) -> Dict[str, float]:
+        """Seconds sampled in each stage, largest first."""
+        times: Counter = Counter()
+        for stage_name, _, weight in self.samples:
+            times[stage_name] += weight
+        return dict(times.most_common())
+
+    def hotspots(self, top: int = 10) -> List[Tuple[str, float]]:
+        """Functions with the most self time, as ``(frame, seconds)``."""
+        times: Counter = Counter()
+        for _, stack, weight in self.samples:
+            times[_frame_name(stack[-1])] += weight
+        return times.most_common(top)
+
+    def report(self, top: int = 10) -> str:
+        """Format stage times and the top hotspots as text."""
+        total = self.total_time or 1.0
+        lines = [f"Profile: {len(self.samples)} samples, {self.total_time:.3f}s", "Time by stage:"]
+        for stage_name, seconds in self.stage_times().items():
+            lines.append(f"  {stage_name:<16}{seconds:8.3f}s {100 * seconds / total:5.1f}%")
+        lines.append(f"Top {top} hotspots (self time):")
+        for frame, seconds in self.hotspots(top):
+            lines.append(f"  {seconds:8.3f}s {100 * seconds / total:5.1f}%  {frame}")
+        return "\n".join(lines)
+
+    def write_speedscope(self, path: str, name: str = "recipify") -> None:
+        """
+        Write the samples as a speedscope profile (https://www.speedscope.app).
+
+        Each stack is rooted at a ``stage:<name>`` frame so the flame graph
+        groups time by recipify stage.
+        """
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Any, int] = {}
+
+        def frame_id(key: Any, entry: Dict[str, Any]) -> int:
+            if key not in index:
+                index[key] = len(frames)
+                frames.append(entry)
+            return index[key]
+
+        samples, weights = [], []
+        for stage_name, stack, weight in self.samples:
+            ids = [frame_id(("stage", stage_name), {"name": f"stage:{stage_name}"})]
+            ids += [
+                frame_id(code, {"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+                for code in stack
+            ]
+            samples.append(ids)
+            weights.append(weight)
+
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "recipify",
+            "name": name,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+        with open(path, "w") as f:
+            json.dump(document, f)
+
+    def write_folded(self, path: str) -> None:
+        """Write collapsed stacks for ``flamegraph.pl`` and similar tools."""
+        folded: Counter = Counter()
+        for stage_name, stack, weight in self.samples:
+            key = ";".join([f"stage:{stage_name}"] + [_frame_name(code) for code in stack])
+            folded[key] += weight
+        with open(path, "w") as f:
+            for key, seconds in folded.items():
+                f.write(f"{key} {max(1, round(seconds * 1e6))}\n")
+
+    def write(self, path: str, name: str = "recipify") -> None:
+        """Write a ``.folded`` file or, for any other extension, speedscope JSON."""
+        if path.endswith(".folded"):
+            self.write_folded(path)
+        else:
+            self.write_speedscope(path, name)
@@ -0,0 +1,125 @@
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Relative CPU cost of each stage per receipt, used to split the cores.
+STAGE_WEIGHTS = {
+    "preprocess": 1,
+    "detect": 2,
+    "ocr": 3,
+}
+
+# Tesseract gains little from more than one OpenMP thread per page, so OCR
+# scales with processes. Torch scales well with intra-op threads, so the
+# detector gets few processes with several threads each.
+MAX_THREADS_PER_WORKER = {
+    "preprocess": 1,
+    "detect": 4,
+    "ocr": 1,
+}
+
+@dataclass(frozen=True)
+class StagePlan:
+    """Number of worker processes for a stage and threads each may use."""
+    workers: int
+    threads: int
+
+    @property
+    def cores(self) -> int:
+        return self.workers * self.threads
+
+def available_cores() -> int:
+    """Return the number of cores this process is allowed to run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def plan_stages(
+    cores: Optional[int] = None,
+    detect: bool = True,
+    weights: Dict[str, int] = STAGE_WEIGHTS,
+) -> Dict[str, StagePlan]:
+    """
+    Split the available cores between pipeline stages.
+
+    Each stage receives a share of the cores proportional to its weight
+    (at least one), which is then divided into worker processes of at most
+    ``MAX_THREADS_PER_WORKER`` threads, so the total never oversubscribes
+    the machine by more than the one-core minimum per stage.
+
+    Args:
+        cores: Cores to divide; defaults to ``available_cores()``.
+        detect: Whether the detection stage runs.
+        weights: Relative cost of each stage.
+
+    Returns:
+        dict[str, StagePlan]: Plan for every stage that runs.
+    """
+    cores = cores or available_cores()
+    stages = [name for name in weights if detect or name != "detect"]
+    total_weight = sum(weights[name] for name in stages)
+
+    plans = {}
+    for name in stages:
+        share = max(1, (cores * weights[name]) // total_weight)
+        threads = min(share, MAX_THREADS_PER_WORKER.get(name, 1))
+        plans[name] = StagePlan(workers=max(1, share // threads), threads=threads)
+
+    logger.info(f"Stage plan for {cores} cores: {plans}")
+    return plans
+
+THREAD_ENV_VARS = ("OMP_THREAD_LIMIT", "OMP_NUM_THREADS", "MKL_NUM_THREADS")
+
+def apply_thread_budget(threads: int) -> None:
+    """
+    Limit the threads used by OpenCV, Tesseract and Torch in this process.
+
+    Call this at the start of a worker process, before any of those
+    libraries start their thread pools. Tesseract runs as a subprocess and
+    picks up ``OMP_THREAD_LIMIT`` from the environment.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+    cv2.setNumThreads(threads)
+
+    # Torch reads OMP_NUM_THREADS when it is first imported; only a module
+    # that is already loaded needs to be told directly.
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+@contextmanager
+def thread_budget(threads: int) -> Iterator[None]:
+    """
+    Apply ``apply_thread_budget`` for the duration of a block.
+
+    The previous environment and OpenCV and Torch thread counts are restored
+    afterwards, so the calling process can borrow a worker's budget.
+    """
+    saved_env = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    saved_cv2 = cv2.getNumThreads()
+    torch = sys.modules.get("torch")
+    saved_torch = torch.get_num_threads() if torch is not None else None
+
+    apply_thread_budget(threads)
+    try:
+        yield
+    finally:
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+        cv2.setNumThreads(saved_cv2)
+        torch = sys.modules.get("torch")
+        if torch is not None and saved_torch is not None:
+            torch.set_num_threads(saved_torch)
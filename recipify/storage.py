@@ -0,0 +1,365 @@
+import json
+import logging
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from recipify.extraction import ReceiptData
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY,
+    vendor TEXT NOT NULL,
+    total REAL NOT NULL,
+    date TEXT,
+    time TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    receipt_id INTEGER NOT NULL REFERENCES receipts(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_receipts_vendor_date ON receipts(vendor, date);
+CREATE INDEX IF NOT EXISTS idx_receipts_date ON receipts(date);
+CREATE INDEX IF NOT EXISTS idx_receipts_total ON receipts(total);
+CREATE INDEX IF NOT EXISTS idx_items_name ON items(name, receipt_id);
+CREATE INDEX IF NOT EXISTS idx_items_receipt ON items(receipt_id);
+"""
+
+DateLike = Union[str, date, datetime]
+
+# Receipts stored per transaction by ``load_batch``.
+LOAD_CHUNK_SIZE = 1000
+
+class ReceiptStoreError(Exception):
+    """Custom exception for receipt storage errors."""
+    pass
+
+def _date_key(value: Optional[DateLike]) -> Optional[str]:
+    """
+    Normalise a date to the ISO ``YYYY-MM-DD`` form used in the index.
+
+    Raises:
+        ReceiptStoreError: If a string is not an ISO date or datetime
+    """
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    try:
+        return datetime.fromisoformat(str(value)).strftime("%Y-%m-%d")
+    except ValueError:
+        raise ReceiptStoreError(f"Expected an ISO date (YYYY-MM-DD), got {value!r}")
+
+class ReceiptStore:
+    """
+    SQLite-backed store for parsed receipts.
+
+    Receipts and their items live in two tables indexed on vendor, date,
+    total and item name, so aggregation queries stay index-driven as the
+    store grows. File-backed stores use WAL journaling, which lets readers
+    run report queries while a loader is writing.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        Open (and create if needed) a receipt store.
+
+        Args:
+            path: SQLite database file, or ``":memory:"`` for a temporary store
+        """
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.conn.close()
+
+    def __enter__(self) -> "ReceiptStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add(self, receipt: Union[ReceiptData, Dict[str, Any]]) -> int:
+        """
+        Insert a single receipt.
+
+        Args:
+            receipt: Parsed receipt, as a model or as returned by ``parse_receipt_data``
+
+        Returns:
+            Row id of the inserted receipt
+        """
+        return self.add_many([receipt])[0]
+
+    def add_many(self, receipts: Iterable[Union[ReceiptData, Dict[str, Any]]]) -> List[int]:
+        """
+        Insert receipts in a single transaction.
+
+        Either every receipt is stored or, if any of them fails validation,
+        none are.
+
+        Args:
+            receipts: Parsed receipts, as models or dictionaries
+
+        Returns:
+            Row ids of the inserted receipts, in input order
+
+        Raises:
+            ReceiptStoreError: If a receipt cannot be validated or stored
+        """
+        ids = []
+        try:
+            with self.conn:
+                cursor = self.conn.cursor()
+                for receipt in receipts:
+                    if not isinstance(receipt, ReceiptData):
+                        receipt = ReceiptData(**receipt)
+                    cursor.execute(
+                        "INSERT INTO receipts (vendor, total, date, time, metadata) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (
+                            receipt.vendor,
+                            receipt.total,
+                            _date_key(receipt.date),
+                            receipt.time,
+                            json.dumps(receipt.metadata, default=str),
+                        ),
+                    )
+                    receipt_id = cursor.lastrowid
+                    cursor.executemany(
+                        "INSERT INTO items (receipt_id, name, price, quantity) "
+                        "VALUES (?, ?, ?, ?)",
+                        [
+                            (receipt_id, item.name, item.price, item.quantity)
+                            for item in receipt.items
+                        ],
+                    )
+                    ids.append(receipt_id)
+        except Exception as e:
+            logger.error(f"Failed to store receipts: {e}")
+            raise ReceiptStoreError(f"Failed to store receipts: {e}")
+        return ids
+
+    def _iter_records(self, path: Union[str, Path]) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield ``(record number, record)`` from a batch output file.
+
+        JSON arrays have to be parsed whole and yield decoded records; JSON
+        Lines files are streamed and yield each line undecoded.
+        """
+        with open(path) as f:
+            is_array = f.read(4096).lstrip().startswith("[")
+            f.seek(0)
+            if is_array:
+                yield from enumerate(json.load(f), 1)
+            else:
+                yield from ((number, line) for number, line in enumerate(f, 1) if line.strip())
+
+    def load_batch(self, path: Union[str, Path], chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+        """
+        Ingest batch pipeline output.
+
+        Accepts either a JSON array or a JSON Lines file of
+        ``parse_receipt_data`` results, or of the ``{"image_path", "data",
+        ...}`` results produced by ``run_pipeline``. JSON Lines files are
+        streamed and stored ``chunk_size`` receipts per transaction. Failed
+        receipts (with an ``"error"`` key) and records that are malformed or
+        fail validation are logged and skipped one by one.
+
+        Args:
+            path: Path to the batch output file
+            chunk_size: Receipts stored per transaction
+
+        Returns:
+            Number of receipts stored
+        """
+        stored = failed = invalid = 0
+        chunk: List[ReceiptData] = []
+        for number, record in self._iter_records(path):
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                if isinstance(record.get("data"), dict):
+                    image_path = record.get("image_path")
+                    record = dict(record["data"])
+                    if image_path:
+                        record["metadata"] = {**record.get("metadata", {}), "image_path": image_path}
+                if "error" in record:
+                    failed += 1
+                    continue
+                chunk.append(ReceiptData(**record))
+            except Exception as e:
+                invalid += 1
+                logger.warning(f"Skipping invalid record {number} in {path}: {e}")
+                continue
+
+            if len(chunk) >= chunk_size:
+                stored += len(self.add_many(chunk))
+                chunk = []
+
+        if chunk:
+            stored += len(self.add_many(chunk))
+        if failed:
+            logger.warning(f"Skipped {failed} failed receipts from {path}")
+        if invalid:
+            logger.warning(f"Skipped {invalid} invalid records from {path}")
+        return stored
+
+    def _date_filter(
+        self,
+        start: Optional[DateLike],
+        end: Optional[DateLike],
+        column: str = "r.date",
+    ) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(_date_key(start))
+        if end is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(_date_key(end))
+        return clauses, params
+
+    def totals_by_vendor(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Dict[str, float]:
+        """
+        Sum receipt totals per vendor.
+
+        Args:
+            start: Optional inclusive start date
+            end: Optional inclusive end date
+
+        Returns:
+            Mapping of vendor to total spend, largest first
+        """
+        clauses, params = self._date_filter(start, end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT r.vendor, ROUND(SUM(r.total), 2) AS spend FROM receipts r {where} "
+            "GROUP BY r.vendor ORDER BY spend DESC",
+            params,
+        )
+        return dict(rows.fetchall())
+
+    def totals_by_month(
+        self,
+        vendor: Optional[str] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Dict[str, float]:
+        """
+        Sum receipt totals per calendar month.
+
+        Receipts without a date are not included.
+
+        Args:
+            vendor: Optional vendor to restrict to
+            start: Optional inclusive start date
+            end: Optional inclusive end date
+
+        Returns:
+            Mapping of ``YYYY-MM`` to total spend, in month order
+        """
+        clauses, params = self._date_filter(start, end)
+        clauses.append("r.date IS NOT NULL")
+        if vendor is not None:
+            clauses.append("r.vendor = ?")
+            params.append(vendor)
+        rows = self.conn.execute(
+            "SELECT substr(r.date, 1, 7) AS month, ROUND(SUM(r.total), 2) "
+            f"FROM receipts r WHERE {' AND '.join(clauses)} "
+            "GROUP BY month ORDER BY month",
+            params,
+        )
+        return dict(rows.fetchall())
+
+    def item_price_history(self, name: str, vendor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List every recorded price of an item over time.
+
+        Args:
+            name: Exact item name as stored
+            vendor: Optional vendor to restrict to
+
+        Returns:
+            List of dictionaries with date, vendor and price, oldest first
+        """
+        sql = (
+            "SELECT r.date, r.vendor, i.price FROM items i "
+            "JOIN receipts r ON r.id = i.receipt_id WHERE i.name = ?"
+        )
+        params: List[Any] = [name]
+        if vendor is not None:
+            sql += " AND r.vendor = ?"
+            params.append(vendor)
+        sql += " ORDER BY r.date, r.id"
+        return [
+            {"date": row[0], "vendor": row[1], "price": row[2]}
+            for row in self.conn.execute(sql, params)
+        ]
+
+    def receipts_between(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        vendor: Optional[str] = None,
+        min_total: Optional[float] = None,
+        max_total: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch receipt headers matching date, vendor and total filters.
+
+        Args:
+            start: Optional inclusive start date
+            end: Optional inclusive end date
+            vendor: Optional vendor to restrict to
+            min_total: Optional inclusive lower bound on the total
+            max_total: Optional inclusive upper bound on the total
+
+        Returns:
+            List of receipt dictionaries (without items), oldest first
+        """
+        clauses, params = self._date_filter(start, end)
+        if vendor is not None:
+            clauses.append("r.vendor = ?")
+            params.append(vendor)
+        if min_total is not None:
+            clauses.append("r.total >= ?")
+            params.append(min_total)
+        if max_total is not None:
+            clauses.append("r.total <= ?")
+            params.append(max_total)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT r.id, r.vendor, r.total, r.date, r.time, r.metadata FROM receipts r {where} "
+            "ORDER BY r.date, r.id",
+            params,
+        )
+        return [
+            {
+                "id": row[0],
+                "vendor": row[1],
+                "total": row[2],
+                "date": row[3],
+                "time": row[4],
+                "metadata": json.loads(row[5]) if row[5] else {},
+            }
+            for row in rows
+        ]
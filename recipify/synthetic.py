@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import random
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+STYLES = ("Walmart", "Cafeteria", "Trader Joe's")
+
+# Class IDs match recipify/dataset.yaml
+CLASS_IDS = {"shop": 0, "item": 1, "total": 2, "date_time": 3, "receipt": 4}
+
+ITEM_NAMES = {
+    "Walmart": [
+        "GV MILK", "BANANAS", "WHITE BREAD", "EGGS 12CT", "PAPER TOWEL", "TOOTHPASTE",
+        "CHEDDAR", "ORANGE JUICE", "DISH SOAP", "COFFEE", "RICE 2LB", "CEREAL",
+    ],
+    "Cafeteria": [
+        "Burger", "Fries", "Soda", "Sandwich", "Salad", "Coffee", "Tea", "Muffin",
+        "Pasta", "Pizza", "Juice", "Cookie",
+    ],
+    "Trader Joe's": [
+        "ORGANIC BANANAS", "MANDARIN CHICKEN", "DARK CHOC BAR", "GREEK YOGURT",
+        "CAULIFLOWER GNOCCHI", "SPARKLING WATER", "TRAIL MIX", "SOURDOUGH LOAF",
+        "AVOCADOS 4CT", "HUMMUS", "CHEESE PUFFS", "COLD BREW",
+    ],
+}
+
+WALMART_NON_FOOD = {"PAPER TOWEL", "TOOTHPASTE", "DISH SOAP"}
+
+# Character confusions typical of Tesseract on thermal receipt prints.
+OCR_CONFUSIONS = {
+    "0": "O", "O": "0", "1": "l", "l": "1", "I": "1", "5": "S", "S": "5",
+    "8": "B", "B": "8", ".": ",", ",": ".", "E": "F", "G": "6", "6": "G",
+}
+
+SHARD_SIZE = 10000
+LINE_HEIGHT = 28
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.6
+
+@dataclass
+class SyntheticReceipt:
+    """A generated receipt: its lines, OCR-style text and ground truth."""
+    index: int
+    seed: int
+    style: str
+    lines: List[Tuple[Optional[str], str]]
+    text: str
+    truth: Dict[str, Any] = field(default_factory=dict)
+
+def _rng(seed: int, index: int) -> random.Random:
+    # Each sample has its own stream so any index can be regenerated on its
+    # own, which lets shards be produced in parallel. String seeds are hashed
+    # with SHA-512, so distinct (seed, index) pairs never share a stream.
+    return random.Random(f"{seed}:{index}")
+
+def _upc(name: str) -> str:
+    """Stable 12-digit product code for an item name."""
+    return f"{zlib.crc32(name.encode()):012d}"
+
+def _receipt_lines(style: str, rng: random.Random, n_items: int) -> Tuple[List[Tuple[Optional[str], str]], Dict[str, Any]]:
+    moment = datetime(2015, 1, 1) + timedelta(minutes=rng.randrange(10 * 365 * 24 * 60))
+    items = []
+    for _ in range(n_items):
+        quantity = rng.choice([1, 1, 1, 2, 3]) if style == "Cafeteria" else 1
+        items.append({
+            "name": rng.choice(ITEM_NAMES[style]),
+            "price": round(rng.uniform(0.5, 25.0), 2),
+            "quantity": quantity,
+        })
+    subtotal = round(sum(item["price"] * item["quantity"] for item in items), 2)
+
+    lines: List[Tuple[Optional[str], str]] = []
+    if style == "Walmart":
+        tax = round(subtotal * 0.07, 2)
+        total = round(subtotal + tax, 2)
+        lines += [("shop", "Walmart"), (None, "Save money. Live better."),
+                  (None, f"ST# {rng.randint(1000, 9999)} OP# {rng.randint(10, 99)}")]
+        # Walmart prints the UPC, an "F" for food items and a tax flag:
+        # N for untaxed food, X for taxed goods.
+        for item in items:
+            food, flag = ("  ", "X") if item["name"] in WALMART_NON_FOOD else ("F ", "N")
+            lines.append(("item", f"{item['name']:<13}{_upc(item['name'])} {food}{item['price']:>6.2f} {flag}"))
+        lines += [(None, f"{'SUBTOTAL':<20}{subtotal:>8.2f}"), (None, f"{'TAX':<20}{tax:>8.2f}"),
+                  ("total", f"{'TOTAL':<20}{total:>8.2f}"),
+                  ("date_time", moment.strftime("%m/%d/%y %H:%M:%S"))]
+    elif style == "Cafeteria":
+        total = subtotal
+        lines += [("shop", "Campus Cafeteria"), (None, "Order Type: " + rng.choice(["Dine-in", "Takeaway"])),
+                  (None, "OrderStatus: Completed")]
+        lines += [("item", f"{item['name']} {item['quantity']} X {item['price']:.2f}") for item in items]
+        lines += [("total", f"Total (INR) = {total:.2f}"), ("date_time", moment.strftime("%m/%d/%y %H:%M"))]
+    else:
+        total = subtotal
+        lines += [("shop", "TRADER JOE'S"), (None, f"Store #{rng.randint(100, 999)}")]
+        lines += [("item", f"{item['name']:<22}{item['price']:>7.2f}") for item in items]
+        lines += [(None, f"{'SUBTOTAL':<22}{subtotal:>7.2f}"), ("total", f"{'TOTAL':<22}${total:.2f}"),
+                  ("date_time", moment.strftime("%m/%d/%y %H:%M"))]
+
+    truth = {
+        "vendor": style,
+        "total": total,
+        "date": moment.replace(hour=0, minute=0, second=0).isoformat(),
+        "time": moment.strftime("%H:%M"),
+        "items": items,
+    }
+    return lines, truth
+
+def inject_ocr_errors(text: str, rate: float, rng: random.Random) -> str:
+    """
+    Corrupt text the way OCR does: confused characters, dropped characters
+    and the occasional garbage line.
+
+    Args:
+        text: Clean receipt text.
+        rate: Probability of corrupting each character (garbage lines are
+            inserted at ``rate`` per line).
+        rng: Random source.
+
+    Returns:
+        str: Corrupted text.
+    """
+    if rate <= 0:
+        return text
+
+    lines = []
+    for line in text.split("\n"):
+        chars = []
+        for char in line:
+            roll = rng.random()
+            if roll < rate / 2 and char in OCR_CONFUSIONS:
+                chars.append(OCR_CONFUSIONS[char])
+            elif roll < rate * 0.6:
+                continue
+            else:
+                chars.append(char)
+        lines.append("".join(chars))
+        if rng.random() < rate:
+            lines.append("".join(rng.choice("|/\\_-.,:;'`~il1 ") for _ in range(rng.randint(3, 60))))
+    return "\n".join(lines)
+
+def generate_receipt(
+    index: int,
+    seed: int = 0,
+    style: Optional[str] = None,
+    min_items: int = 3,
+    max_items: int = 15,
+    ocr_error_rate: float = 0.0,
+) -> SyntheticReceipt:
+    """
+    Generate one receipt deterministically from ``(seed, index)``.
+
+    Args:
+        index: Sample number.
+        seed: Dataset seed.
+        style: One of ``STYLES``; chosen at random when omitted.
+        min_items: Fewest item lines.
+        max_items: Most item lines.
+        ocr_error_rate: Character corruption rate applied to ``text``.
+
+    Returns:
+        SyntheticReceipt: Clean lines for rendering, the (possibly
+        corrupted) text and the ground truth.
+    """
+    rng = _rng(seed, index)
+    style = style or rng.choice(STYLES)
+    lines, truth = _receipt_lines(style, rng, rng.randint(min_items, max_items))
+    text = inject_ocr_errors("\n".join(line for _, line in lines), ocr_error_rate, rng)
+    return SyntheticReceipt(index=index, seed=seed, style=style, lines=lines, text=text, truth=truth)
+
+def render_receipt(receipt: SyntheticReceipt, noise: float = 0.0, width: int = 640) -> Tuple[np.ndarray, List[str]]:
+    """
+    Draw a receipt on a darker background and compute YOLO labels.
+
+    Args:
+        receipt: Receipt to draw.
+        noise: 0 for a clean scan up to 1 for heavy sensor noise and blur.
+        width: Image width in pixels.
+
+    Returns:
+        tuple: BGR image and YOLO label lines (``class cx cy w h``, normalised).
+    """
+    rng = np.random.default_rng([receipt.seed, receipt.index])
+    margin = 40
+    height = 2 * margin + LINE_HEIGHT * (len(receipt.lines) + 2)
+    image = np.full((height, width), 90, dtype=np.uint8)
+    paper = (margin // 2, margin // 2, width - margin // 2, height - margin // 2)
+    cv2.rectangle(image, paper[:2], paper[2:], 250, thickness=-1)
+
+    boxes = [("receipt", paper)]
+    for row, (kind, line) in enumerate(receipt.lines, 1):
+        (text_w, text_h), baseline = cv2.getTextSize(line, FONT, FONT_SCALE, 1)
+        x, y = margin, margin + row * LINE_HEIGHT
+        cv2.putText(image, line, (x, y), FONT, FONT_SCALE, 20, 1, cv2.LINE_AA)
+        if kind:
+            boxes.append((kind, (x, y - text_h, x + text_w, y + baseline)))
+
+    if noise > 0:
+        image = image.astype(np.float32) + rng.normal(0, 40 * noise, image.shape)
+        image = np.clip(image, 0, 255).astype(np.uint8)
+        if noise > 0.5:
+            image = cv2.GaussianBlur(image, (3, 3), noise)
+
+    labels = []
+    for kind, (x1, y1, x2, y2) in boxes:
+        labels.append(
+            f"{CLASS_IDS[kind]} {(x1 + x2) / 2 / width} {(y1 + y2) / 2 / height} "
+            f"{(x2 - x1) / width} {(y2 - y1) / height}"
+        )
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), labels
+
+def iter_receipts(count: int, seed: int = 0, start: int = 0, **kwargs: Any) -> Iterator[SyntheticReceipt]:
+    """Yield ``count`` receipts starting at ``start`` without holding them in memory."""
+    for index in range(start, start + count):
+        yield generate_receipt(index, seed, **kwargs)
+
+def generate_dataset(
+    output_dir: str,
+    count: int,
+    seed: int = 0,
+    start: int = 0,
+    images: bool = True,
+    noise: float = 0.0,
+    **kwargs: Any,
+) -> int:
+    """
+    Write a synthetic dataset.
+
+    Ground truth (with the OCR-style text) goes to ``truth-<start>.jsonl``,
+    which ``ReceiptStore.load_batch`` can ingest directly. The file is
+    overwritten on reruns, and shards generated in parallel with different
+    ``start`` values each write their own. With ``images`` set,
+    rendered receipts and YOLO labels are written under ``images/`` and
+    ``labels/`` in shards of ``SHARD_SIZE`` so directories stay small.
+
+    Args:
+        output_dir: Destination directory.
+        count: Number of receipts.
+        seed: Dataset seed.
+        start: First sample index, for generating shards in parallel.
+        images: Whether to render images and labels.
+        noise: Image noise level passed to ``render_receipt``.
+        **kwargs: Passed to ``generate_receipt``.
+
+    Returns:
+        int: Number of receipts written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    with open(os.path.join(output_dir, f"truth-{start:09d}.jsonl"), "w") as truth_file:
+        for receipt in iter_receipts(count, seed, start, **kwargs):
+            record = dict(receipt.truth, style=receipt.style, text=receipt.text)
+            if images:
+                shard = f"{receipt.index // SHARD_SIZE:04d}"
+                image_dir = os.path.join(output_dir, "images", shard)
+                label_dir = os.path.join(output_dir, "labels", shard)
+                os.makedirs(image_dir, exist_ok=True)
+                os.makedirs(label_dir, exist_ok=True)
+
+                image, labels = render_receipt(receipt, noise)
+                image_path = os.path.join(image_dir, f"{receipt.index}.jpg")
+                cv2.imwrite(image_path, image)
+                with open(os.path.join(label_dir, f"{receipt.index}.txt"), "w") as label_file:
+                    label_file.write("\n".join(labels) + "\n")
+                record["image_path"] = image_path
+
+            truth_file.write(json.dumps(record) + "\n")
+            written += 1
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic receipts")
+    parser.add_argument("--output", type=str, required=True, help="Directory to write the dataset to")
+    parser.add_argument("--count", type=int, default=1000, help="Number of receipts")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed")
+    parser.add_argument("--start", type=int, default=0, help="First sample index (for parallel shards)")
+    parser.add_argument("--style", type=str, choices=STYLES, help="Only generate this receipt style")
+    parser.add_argument("--min-items", type=int, default=3, help="Fewest item lines per receipt")
+    parser.add_argument("--max-items", type=int, default=15, help="Most item lines per receipt")
+    parser.add_argument("--ocr-error-rate", type=float, default=0.0, help="Character corruption rate in the text")
+    parser.add_argument("--noise", type=float, default=0.0, help="Image noise level between 0 and 1")
+    parser.add_argument("--text-only", action="store_true", help="Skip rendering images and labels")
+    args = parser.parse_args()
+
+    written = generate_dataset(
+        args.output,
+        args.count,
+        seed=args.seed,
+        start=args.start,
+        images=not args.text_only,
+        noise=args.noise,
+        style=args.style,
+        min_items=args.min_items,
+        max_items=args.max_items,
+        ocr_error_rate=args.ocr_error_rate,
+    )
+    print(f"Wrote {written} receipts to {args.output}")
@@ -0,0 +1,152 @@
+import os
+import random
+import string
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from recipify.extraction import (
+    MAX_ITEM_LINE_LENGTH,
+    parse_item_lines,
+    parse_trader_joes_receipt,
+    parse_walmart_receipt,
+)
+
+ANNOTATIONS = os.path.join(os.path.dirname(__file__), "..", "..", "dataset", "annotations.xml")
+
+# Inputs that made the old ``([A-Za-z0-9 ]+)\s+([\d.]+)`` pattern backtrack:
+# long runs of word characters and spaces that never end in a price.
+PATHOLOGICAL_LINES = [
+    "a " * 50 + "!",
+    "1 " * 50 + "x",
+    " " * 100 + "a",
+    "A1" * 50 + " " + "." * 20,
+    "9" * 100,
+]
+
+# Item strings from dataset/annotations.xml and the item the parser should
+# recover from each.
+ANNOTATED_ITEMS = [
+    ("FRAP 001200010451 F 5.48 N", ("FRAP", 5.48)),
+    ("A-AVOCADOS HASS BAG 4CT 3.99", ("A-AVOCADOS HASS BAG 4CT", 3.99)),
+    ("TOMATOES WHOLE NO SALT W/BASIL 1.59", ("TOMATOES WHOLE NO SALT W/BASIL", 1.59)),
+    ("MINI-PEARL TOMATOES.. 2.49", ("MINI-PEARL TOMATOES", 2.49)),
+    ("F/L ENGLISH CUCUMB 1'S 12.99 *", ("F/L ENGLISH CUCUMB 1'S", 12.99)),
+    ("SMOKED VIENNAS 500GR 33.99 A", ("SMOKED VIENNAS 500GR", 33.99)),
+    ("* PL TORTILLA'S 6.99 B", ("PL TORTILLA'S", 6.99)),
+    ("DIABETES 068113131172H 12.58 N", ("DIABETES", 12.58)),
+    ("BANANAS 000000004011KF 0.41 lb @ 1 lb /0.49 0.20 N", ("BANANAS", 0.20)),
+    ("GIFT CARD 087458604333 50.00 0", ("GIFT CARD", 50.00)),
+    ("PILLS WHITE 068113113619 F 1.00Y", ("PILLS WHITE", 1.00)),
+    ("KITL SEA SALT POT CHP $1.29 F", ("KITL SEA SALT POT CHP", 1.29)),
+    ("E 6333561 KS DICED TOM 6.49 E", ("KS DICED TOM", 6.49)),
+    ("404609 ECO HALF PAN 6.49 A", ("ECO HALF PAN", 6.49)),
+    ("E 22101 MONT JACK 2# 4.45 E", ("MONT JACK 2#", 4.45)),
+    ("PORK 1/2 LOIN 20323300000 8.12 FS", ("PORK 1/2 LOIN", 8.12)),
+    ("DM SPAG SAUCE 2400052363 .71 FS", ("DM SPAG SAUCE", 0.71)),
+]
+
+def _annotated_item_texts():
+    root = ET.parse(ANNOTATIONS).getroot()
+    return [
+        attribute.text
+        for box in root.iter("box")
+        if box.get("label") == "item"
+        for attribute in box.iter("attribute")
+        if attribute.get("name") == "text" and attribute.text
+    ]
+
+def _noisy_text(n_lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + " .,:$-|/\\'"
+    lines = []
+    for _ in range(n_lines):
+        length = rng.randint(0, 2 * MAX_ITEM_LINE_LENGTH)
+        lines.append("".join(rng.choice(alphabet) for _ in range(length)))
+    return "\n".join(lines)
+
+def _best_time(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def test_parse_item_lines_basic():
+    text = """
+    Walmart
+    123 Main St
+    City, State 12345
+    Apple          1.99
+    Organic Milk   $3.49
+    SUBTOTAL       5.48
+    TAX            0.12
+    TOTAL          5.60
+    03/15/24 14:30
+    """
+    assert parse_item_lines(text) == [("Apple", 1.99), ("Organic Milk", 3.49)]
+
+def test_parse_item_lines_skips_long_lines():
+    long_line = "x" * MAX_ITEM_LINE_LENGTH + " 1.99"
+    assert parse_item_lines(long_line) == []
+    assert parse_item_lines(long_line, max_line_length=len(long_line)) == [
+        ("x" * MAX_ITEM_LINE_LENGTH, 1.99)
+    ]
+
+def test_parse_item_lines_rejects_bad_prices():
+    assert parse_item_lines("Apple 1.9.9") == []
+    assert parse_item_lines("Apple 0.00") == []
+    assert parse_item_lines("Apple 123456.00") == []
+
+@pytest.mark.parametrize("text, expected", ANNOTATED_ITEMS)
+def test_annotated_item_lines(text, expected):
+    assert parse_item_lines(text) == [expected]
+
+@pytest.mark.skipif(not os.path.exists(ANNOTATIONS), reason="annotations not available")
+def test_annotated_item_recall():
+    texts = _annotated_item_texts()
+    found = sum(1 for text in texts if parse_item_lines(text))
+    assert found / len(texts) > 0.9
+
+@pytest.mark.parametrize("line", ["CASHEWS 4.99", "BALANCE BAR 1.99", "TAXI 3.00", "Change Purse 2.00"])
+def test_non_item_words_only_match_whole_names(line):
+    assert len(parse_item_lines(line)) == 1
+
+@pytest.mark.parametrize("line", [
+    "SUBTOTAL 5.48", "TOTAL: 5.60", "TAX 1 0.35", "CHANGE DUE 1.00", "Total Tax 0.40",
+    "DEBIT TEND 98.08", "VISA TEND 20.00", "CASH TEND 10.00", "TOTAL DUE 5.60",
+    "TOTAL PURCHASE 5.60", "US DEBIT 5.60", "TAX 1 6.750 % 4.46", "TAX 1 7.000 % 0.35",
+])
+def test_non_item_lines(line):
+    assert parse_item_lines(line) == []
+
+@pytest.mark.parametrize("line", PATHOLOGICAL_LINES)
+def test_pathological_lines(line):
+    assert parse_item_lines("\n".join([line] * 1000)) == []
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fuzz_noisy_ocr(seed):
+    text = _noisy_text(200, seed)
+    for name, price in parse_item_lines(text):
+        assert name and name == name.strip()
+        assert 0 < price < 100000
+
+def test_legacy_parsers_use_line_parser():
+    text = "Apple 1.99\nBanana 0.99\nTOTAL 2.98\n" + "a " * 5000
+    assert parse_walmart_receipt(text)["items"] == [
+        {"name": "Apple", "price": 1.99},
+        {"name": "Banana", "price": 0.99},
+    ]
+    assert len(parse_trader_joes_receipt(text)["items"]) == 2
+
+@pytest.mark.parametrize("line", PATHOLOGICAL_LINES)
+def test_worst_case_scales_linearly(line):
+    small = "\n".join([line] * 500)
+    large = "\n".join([line] * 4000)
+    small_time = _best_time(parse_item_lines, small)
+    large_time = _best_time(parse_item_lines, large)
+    # 8x the input should cost roughly 8x the time; allow generous headroom
+    # for timer noise while still catching super-linear blow-up.
+    assert large_time < max(small_time, 1e-4) * 24
@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import sys
+import types
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from recipify import pipeline
+from recipify.pipeline import PipelineStats, _parse_date, missing_fields, process_receipt, run_pipeline
+from recipify.triage import TriageThresholds
+
+# OCR output for the stubbed stage, keyed by the pixel value of the image.
+# The second receipt's date is not in a layout the text parser reads, so the
+# date has to be recovered from the detected date_time region.
+OCR_TEXT = {
+    1: "Walmart\nMILK 2.00\nTOTAL 5.11\n08/20/10 12:34",
+    2: "Walmart\nMILK 2.00\nTOTAL 5.11\n06-28-2014 12:34PM",
+}
+
+DETECTIONS = [{"label": "date_time", "confidence": 0.9, "coordinates": [0.0, 0.0, 8.0, 8.0]}]
+
+@pytest.fixture
+def stub_stages(monkeypatch):
+    """Replace preprocessing, OCR and the YOLO detector with fast fakes."""
+    detection = types.ModuleType("recipify.detection")
+    detection.load_yolo_model = lambda weights: object()
+    detection.detect_receipt_elements = lambda model, image: DETECTIONS
+    monkeypatch.setitem(sys.modules, "recipify.detection", detection)
+    monkeypatch.setattr(pipeline, "preprocess_image", lambda image, config=None: image)
+    monkeypatch.setattr(pipeline, "extract_text", lambda image, config=None: OCR_TEXT[int(image.flat[0])])
+
+@pytest.fixture
+def complete_data():
+    return {
+        "vendor": "Walmart",
+        "total": 6.47,
+        "date": datetime(2024, 3, 15),
+        "items": [{"name": "Apple", "price": 1.99, "quantity": 1}],
+    }
+
+def test_missing_fields_complete(complete_data):
+    assert missing_fields(complete_data) == []
+
+def test_missing_fields_placeholders(complete_data):
+    complete_data.update(vendor="Unknown", total=0.0, date=None)
+    assert missing_fields(complete_data) == ["total", "date", "vendor"]
+
+def test_missing_fields_total_below_items(complete_data):
+    complete_data["items"] = [{"name": "TV", "price": 199.0, "quantity": 1}]
+    assert missing_fields(complete_data) == ["total"]
+
+def test_missing_fields_error():
+    assert missing_fields({"error": "Empty receipt text"}) == ["total", "date", "vendor"]
+    assert missing_fields({"error": "x"}, required=("date",)) == ["date"]
+
+def test_detection_summary():
+    stats = PipelineStats()
+    assert stats.detection_summary()["skip_rate"] == 0.0
+
+    stats.counters.update(detect_run=1, detect_skipped=3)
+    stats.detect_times.append(0.5)
+    summary = stats.summary()["detection"]
+    assert summary["skip_rate"] == 0.75
+    assert summary["saved_seconds"] == 1.5
+
+@pytest.mark.parametrize("text, expected", [
+    ("08/20/10 12:34", datetime(2010, 8, 20)),
+    ("06-28-2014 12:34PM", datetime(2014, 6, 28)),
+    ("2014.06.28", datetime(2014, 6, 28)),
+    ("no date", None),
+])
+def test_parse_date(text, expected):
+    assert _parse_date(text) == expected
+
+def test_process_receipt_regions_scores_triage(stub_stages, monkeypatch):
+    monkeypatch.setattr(pipeline, "quality_metrics", lambda image: {
+        "blur": 500.0, "contrast": 80.0, "text_density": 0.1, "skew": 0.0,
+    })
+    image = np.full((16, 16, 3), 1, dtype=np.uint8)
+
+    result = process_receipt(image, model=object(), regions=True)
+    assert result["route"] == "light"
+    assert result["detections"] == DETECTIONS
+
+    strict = TriageThresholds(min_receipt_score=0.95)
+    assert process_receipt(image, model=object(), thresholds=strict, regions=True)["route"] == "reject"
+    assert process_receipt(image, model=object(), thresholds=strict)["detect_skipped"]
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="stubs reach workers only when forked")
+def test_run_pipeline_detects_on_demand(stub_stages, tmp_path):
+    paths = []
+    for value in OCR_TEXT:
+        path = str(tmp_path / f"{value}.png")
+        cv2.imwrite(path, np.full((16, 16, 3), value, dtype=np.uint8))
+        paths.append(path)
+    paths.append(str(tmp_path / "missing.png"))
+    shm_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+    stats = PipelineStats()
+    results = run_pipeline(paths, yolo_weights="fake.pt", cores=3, stats=stats, thresholds=None)
+
+    complete, recovered, unreadable = results
+    assert complete["detect_skipped"]
+    assert "detections" not in complete
+    assert complete["data"]["date"] == datetime(2010, 8, 20)
+
+    assert recovered["detections"] == DETECTIONS
+    assert recovered["data"]["date"] == datetime(2014, 6, 28)
+    assert recovered["data"]["recovered_fields"] == ["date"]
+
+    assert "Could not read image" in unreadable["data"]["error"]
+    assert stats.counters["detect_run"] == 1
+    assert stats.counters["detect_skipped"] == 1
+    assert stats.counters["unreadable"] == 1
+    assert stats.counters["completed"] == 2
+    assert len(stats.detect_times) == 1
+    if os.path.isdir("/dev/shm"):
+        assert set(os.listdir("/dev/shm")) <= shm_before
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="stubs reach workers only when forked")
+def test_run_pipeline_raises_when_a_worker_dies(stub_stages, monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "extract_text", lambda image, config=None: os._exit(1))
+    path = str(tmp_path / "1.png")
+    cv2.imwrite(path, np.full((16, 16, 3), 1, dtype=np.uint8))
+    shm_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        run_pipeline([path] * 40, queue_size=2, cores=2, thresholds=None)
+    if os.path.isdir("/dev/shm"):
+        assert set(os.listdir("/dev/shm")) <= shm_before
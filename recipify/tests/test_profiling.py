@@ -0,0 +1,77 @@
+import json
+import re
+import threading
+import time
+
+from recipify.profiling import (
+    OTHER_STAGE,
+    SamplingProfiler,
+    current_stage,
+    profiled_stage,
+    stage,
+)
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+@profiled_stage("parse")
+def _parse_like():
+    _busy(0.1)
+
+def _profile_run():
+    with SamplingProfiler(interval=0.001) as profiler:
+        with stage("preprocess"):
+            _busy(0.1)
+        with stage("ocr_psm6"):
+            time.sleep(0.1)
+        _parse_like()
+    return profiler
+
+def test_stage_nesting():
+    assert current_stage() == OTHER_STAGE
+    with stage("ocr_psm6"):
+        with stage("parse"):
+            assert current_stage() == "parse"
+        assert current_stage() == "ocr_psm6"
+    assert current_stage() == OTHER_STAGE
+
+def test_stages_are_per_thread():
+    seen = []
+    with stage("detect"):
+        thread = threading.Thread(target=lambda: seen.append(current_stage()))
+        thread.start()
+        thread.join()
+    assert seen == [OTHER_STAGE]
+
+def test_stage_times_and_hotspots():
+    profiler = _profile_run()
+    times = profiler.stage_times()
+    for name in ("preprocess", "ocr_psm6", "parse"):
+        assert 0.05 < times[name] < 0.3
+    assert any("_busy" in frame for frame, _ in profiler.hotspots(3))
+
+    report = profiler.report(top=3)
+    assert "Time by stage:" in report
+    assert "preprocess" in report
+
+def test_write_speedscope(tmp_path):
+    profiler = _profile_run()
+    path = tmp_path / "run.speedscope.json"
+    profiler.write(str(path), name="test")
+
+    document = json.loads(path.read_text())
+    profile = document["profiles"][0]
+    frames = document["shared"]["frames"]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == len(profiler.samples)
+    roots = {frames[sample[0]]["name"] for sample in profile["samples"]}
+    assert {"stage:preprocess", "stage:ocr_psm6", "stage:parse"} <= roots
+
+def test_write_folded(tmp_path):
+    profiler = _profile_run()
+    path = tmp_path / "run.folded"
+    profiler.write(str(path))
+    for line in path.read_text().splitlines():
+        assert re.match(r"stage:\w+;.* \d+$", line)
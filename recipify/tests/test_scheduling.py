@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from recipify.scheduling import (
+    MAX_THREADS_PER_WORKER,
+    StagePlan,
+    apply_thread_budget,
+    available_cores,
+    plan_stages,
+    thread_budget,
+)
+
+def test_available_cores():
+    assert available_cores() >= 1
+
+@pytest.mark.parametrize("cores", [1, 2, 4, 8, 16, 64])
+def test_plan_does_not_oversubscribe(cores):
+    plans = plan_stages(cores)
+    assert set(plans) == {"preprocess", "detect", "ocr"}
+    assert sum(plan.cores for plan in plans.values()) <= max(cores, len(plans))
+    for name, plan in plans.items():
+        assert plan.workers >= 1
+        assert 1 <= plan.threads <= MAX_THREADS_PER_WORKER[name]
+
+def test_plan_gives_ocr_most_workers():
+    plans = plan_stages(48)
+    assert plans["ocr"] == StagePlan(workers=24, threads=1)
+    assert plans["detect"] == StagePlan(workers=4, threads=4)
+    assert plans["preprocess"] == StagePlan(workers=8, threads=1)
+
+def test_plan_without_detection():
+    plans = plan_stages(8, detect=False)
+    assert set(plans) == {"preprocess", "ocr"}
+    assert plans["ocr"].workers == 6
+
+def test_apply_thread_budget(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    apply_thread_budget(2)
+    assert os.environ["OMP_THREAD_LIMIT"] == "2"
+
+def test_thread_budget_restores_settings(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setenv("OMP_NUM_THREADS", "8")
+    with thread_budget(1):
+        assert os.environ["OMP_THREAD_LIMIT"] == "1"
+        assert os.environ["OMP_NUM_THREADS"] == "1"
+    assert "OMP_THREAD_LIMIT" not in os.environ
+    assert os.environ["OMP_NUM_THREADS"] == "8"
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from recipify.extraction import ReceiptData, ReceiptItem
+from recipify.storage import ReceiptStore, ReceiptStoreError
+
+@pytest.fixture
+def store():
+    store = ReceiptStore()
+    store.add_many([
+        ReceiptData(
+            vendor="Walmart",
+            total=6.47,
+            date=datetime(2024, 3, 15),
+            items=[ReceiptItem(name="Apple", price=1.99), ReceiptItem(name="Milk", price=3.49)],
+        ),
+        ReceiptData(
+            vendor="Walmart",
+            total=10.00,
+            date=datetime(2024, 4, 2),
+            items=[ReceiptItem(name="Apple", price=2.19)],
+        ),
+        {
+            "vendor": "Cafeteria",
+            "total": 22.96,
+            "date": "2024-03-20T00:00:00",
+            "items": [{"name": "Burger", "quantity": 2, "price": 8.99}],
+            "metadata": {"order_type": "Dine-in"},
+        },
+    ])
+    yield store
+    store.close()
+
+def test_totals_by_vendor(store):
+    assert store.totals_by_vendor() == {"Cafeteria": 22.96, "Walmart": 16.47}
+    assert store.totals_by_vendor(start="2024-04-01") == {"Walmart": 10.0}
+
+def test_totals_by_month(store):
+    assert store.totals_by_month() == {"2024-03": 29.43, "2024-04": 10.0}
+    assert store.totals_by_month(vendor="Walmart") == {"2024-03": 6.47, "2024-04": 10.0}
+
+def test_item_price_history(store):
+    assert store.item_price_history("Apple") == [
+        {"date": "2024-03-15", "vendor": "Walmart", "price": 1.99},
+        {"date": "2024-04-02", "vendor": "Walmart", "price": 2.19},
+    ]
+
+def test_receipts_between(store):
+    receipts = store.receipts_between("2024-03-01", "2024-03-31")
+    assert [r["vendor"] for r in receipts] == ["Walmart", "Cafeteria"]
+    assert receipts[1]["metadata"] == {"order_type": "Dine-in"}
+    assert len(store.receipts_between(min_total=20)) == 1
+
+@pytest.mark.parametrize("start", ["03/15/2024", "2024-3-15", "last week"])
+def test_non_iso_dates_are_rejected(store, start):
+    with pytest.raises(ReceiptStoreError):
+        store.totals_by_vendor(start=start)
+    with pytest.raises(ReceiptStoreError):
+        store.receipts_between(start=start)
+
+def test_add_many_is_atomic(store):
+    with pytest.raises(ReceiptStoreError):
+        store.add_many([
+            {"vendor": "Walmart", "total": 1.0},
+            {"vendor": "Walmart", "total": 1.0, "items": [{"name": "", "price": 1.0}]},
+        ])
+    assert len(store.receipts_between()) == 3
+
+def test_load_batch(tmp_path):
+    records = [
+        {"vendor": "Walmart", "total": 2.98, "date": "2024-03-15T00:00:00",
+         "items": [{"name": "Apple", "price": 1.99}, {"name": "Banana", "price": 0.99}]},
+        {"error": "Empty receipt text"},
+    ]
+    jsonl = tmp_path / "batch.jsonl"
+    jsonl.write_text("\n".join(json.dumps(r) for r in records))
+    array = tmp_path / "batch.json"
+    array.write_text(json.dumps(records))
+
+    with ReceiptStore(tmp_path / "receipts.db") as store:
+        assert store.load_batch(jsonl) == 1
+        assert store.load_batch(array) == 1
+        assert store.totals_by_vendor() == {"Walmart": 5.96}
+
+def test_load_batch_skips_invalid_records(tmp_path):
+    lines = [
+        json.dumps({"vendor": "Walmart", "total": 1.99, "items": [{"name": "Apple", "price": 1.99}]}),
+        json.dumps({"vendor": "Walmart", "total": 20000.0, "items": [{"name": "TV", "price": 20000.0}]}),
+        "{not json",
+        json.dumps({"total": 3.0}),
+        json.dumps({"vendor": "Cafeteria", "total": 3.0}),
+    ]
+    path = tmp_path / "batch.jsonl"
+    path.write_text("\n".join(lines))
+
+    with ReceiptStore() as store:
+        assert store.load_batch(path, chunk_size=1) == 2
+        assert store.totals_by_vendor() == {"Cafeteria": 3.0, "Walmart": 1.99}
+
+def test_load_batch_pipeline_results(tmp_path):
+    results = [
+        {"image_path": "a.jpg", "route": "light", "data": {"vendor": "Walmart", "total": 2.5}},
+        {"image_path": "b.jpg", "route": "reject", "data": {"error": "Rejected by image-quality triage"}},
+    ]
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps(results))
+
+    with ReceiptStore() as store:
+        assert store.load_batch(path) == 1
+        assert store.receipts_between()[0]["metadata"] == {"image_path": "a.jpg"}
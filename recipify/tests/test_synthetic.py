@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from recipify.extraction import parse_item_lines
+from recipify.synthetic import (
+    CLASS_IDS,
+    STYLES,
+    generate_dataset,
+    generate_receipt,
+    iter_receipts,
+    render_receipt,
+)
+
+def test_generation_is_deterministic():
+    first = generate_receipt(42, seed=7, ocr_error_rate=0.05)
+    second = generate_receipt(42, seed=7, ocr_error_rate=0.05)
+    assert first == second
+    assert generate_receipt(43, seed=7).text != first.text
+
+def test_seeds_do_not_collide():
+    assert generate_receipt(1_000_003, seed=0).text != generate_receipt(0, seed=1).text
+
+def test_walmart_items_carry_upc_and_tax_flag():
+    receipt = generate_receipt(0, style="Walmart")
+    item_lines = [line for kind, line in receipt.lines if kind == "item"]
+    for line, item in zip(item_lines, receipt.truth["items"]):
+        tokens = line.split()
+        assert tokens[-1] in ("N", "X")
+        assert any(len(token) == 12 and token.isdigit() for token in tokens)
+
+@pytest.mark.parametrize("style", STYLES)
+def test_item_count_and_total(style):
+    receipt = generate_receipt(0, style=style, min_items=5, max_items=5)
+    items = receipt.truth["items"]
+    assert len(items) == 5
+    assert receipt.truth["vendor"] == style
+    assert f"{receipt.truth['total']:.2f}" in receipt.text
+
+@pytest.mark.parametrize("style", ["Walmart", "Trader Joe's"])
+def test_clean_text_parses_to_ground_truth(style):
+    receipt = generate_receipt(3, style=style)
+    expected = [(item["name"], item["price"]) for item in receipt.truth["items"]]
+    assert parse_item_lines(receipt.text) == expected
+
+def test_ocr_errors_change_text():
+    clean = generate_receipt(5, ocr_error_rate=0.0)
+    noisy = generate_receipt(5, ocr_error_rate=0.2)
+    assert clean.truth == noisy.truth
+    assert clean.text != noisy.text
+
+def test_render_labels():
+    receipt = generate_receipt(1, min_items=4, max_items=4)
+    image, labels = render_receipt(receipt, noise=0.8)
+    assert image.ndim == 3
+    classes = [int(label.split()[0]) for label in labels]
+    assert classes.count(CLASS_IDS["item"]) == 4
+    assert {CLASS_IDS["shop"], CLASS_IDS["total"], CLASS_IDS["date_time"], CLASS_IDS["receipt"]} <= set(classes)
+    for label in labels:
+        assert all(0 <= float(value) <= 1 for value in label.split()[1:])
+
+def test_iter_receipts_matches_generate():
+    receipts = list(iter_receipts(3, seed=1, start=10))
+    assert [r.index for r in receipts] == [10, 11, 12]
+    assert receipts[0] == generate_receipt(10, seed=1)
+
+def test_generate_dataset(tmp_path):
+    assert generate_dataset(str(tmp_path), 3, seed=2) == 3
+    records = [json.loads(line) for line in (tmp_path / "truth-000000000.jsonl").read_text().splitlines()]
+    assert len(records) == 3
+    assert (tmp_path / "images" / "0000" / "0.jpg").exists()
+    assert (tmp_path / "labels" / "0000" / "2.txt").exists()
+    assert records[0]["image_path"].endswith("0.jpg")
+
+def test_generate_text_only(tmp_path):
+    generate_dataset(str(tmp_path), 5, images=False)
+    assert not (tmp_path / "images").exists()
+    assert len((tmp_path / "truth-000000000.jsonl").read_text().splitlines()) == 5
+
+def test_rerun_and_shards_write_separate_files(tmp_path):
+    generate_dataset(str(tmp_path), 5, images=False)
+    generate_dataset(str(tmp_path), 5, images=False)
+    generate_dataset(str(tmp_path), 5, start=5, images=False)
+    assert len((tmp_path / "truth-000000000.jsonl").read_text().splitlines()) == 5
+    assert len((tmp_path / "truth-000000005.jsonl").read_text().splitlines()) == 5
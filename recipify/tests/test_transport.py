@@ -0,0 +1,86 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from recipify.transport import SharedImageTransport
+
+def _consume(transport, handle, results):
+    image = transport.attach(handle)
+    results.put(int(image.sum()))
+    del image
+    transport.release(handle)
+
+def _put_unreleased(transport, results):
+    results.put(transport.put(np.zeros((8, 8), dtype=np.uint8)))
+
+def _is_unlinked(handle):
+    try:
+        shared_memory.SharedMemory(name=handle.name).close()
+    except FileNotFoundError:
+        return True
+    return False
+
+def test_round_trip_in_process():
+    transport = SharedImageTransport()
+    image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    handle = transport.put(image)
+
+    assert handle.shape == (3, 4)
+    assert handle.nbytes == image.nbytes
+    np.testing.assert_array_equal(transport.attach(handle), image)
+
+    assert transport.release(handle) == 0
+    assert _is_unlinked(handle)
+
+def test_release_after_last_reference_across_processes():
+    transport = SharedImageTransport()
+    image = np.ones((64, 64, 3), dtype=np.uint8)
+    handle = transport.put(image, refs=2)
+    results = multiprocessing.Queue()
+
+    workers = [
+        multiprocessing.Process(target=_consume, args=(transport, handle, results))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    sums = [results.get(timeout=10) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    assert sums == [image.sum()] * 2
+    assert _is_unlinked(handle)
+    assert transport.cleanup() == 0
+
+def test_cleanup_removes_unreleased_segments():
+    transport = SharedImageTransport()
+    handle = transport.put(np.zeros((8, 8), dtype=np.uint8), refs=3)
+    transport.release(handle)
+
+    assert not _is_unlinked(handle)
+    assert transport.cleanup() == 1
+    assert _is_unlinked(handle)
+
+def test_cleanup_removes_worker_created_segments():
+    transport = SharedImageTransport()
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_put_unreleased, args=(transport, results))
+    worker.start()
+    handle = results.get(timeout=10)
+    worker.join()
+
+    assert not _is_unlinked(handle)
+    assert transport.cleanup() == 1
+    assert _is_unlinked(handle)
+
+def test_released_segments_are_forgotten():
+    transport = SharedImageTransport()
+    for _ in range(100):
+        transport.release(transport.put(np.zeros(4, dtype=np.uint8)))
+    assert len(transport._live) == 0
+
+def test_invalid_refs():
+    with pytest.raises(ValueError):
+        SharedImageTransport().put(np.zeros(1), refs=0)
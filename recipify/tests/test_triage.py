@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from recipify.config.pipeline import PipelineConfig
+from recipify.triage import (
+    LIGHT_MAX_SIDE,
+    TriageThresholds,
+    quality_metrics,
+    receipt_score,
+    route_config,
+    triage,
+)
+
+def _synthetic_receipt(angle=0.0):
+    image = np.full((800, 400), 255, dtype=np.uint8)
+    for row, y in enumerate(range(40, 760, 30)):
+        cv2.putText(image, f"ITEM {row:02d}        {row}.99", (20, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, 0, 2)
+    if angle:
+        matrix = cv2.getRotationMatrix2D((200, 400), angle, 1.0)
+        image = cv2.warpAffine(image, matrix, (400, 800), borderValue=255)
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+def test_clean_receipt_takes_light_path():
+    metrics = quality_metrics(_synthetic_receipt())
+    assert metrics["skew"] == 0.0
+    assert 0 < metrics["text_density"] < 0.5
+    assert triage(metrics) == "light"
+
+def test_skewed_receipt_takes_heavy_path():
+    metrics = quality_metrics(_synthetic_receipt(angle=6))
+    assert abs(metrics["skew"]) >= 3
+    assert triage(metrics) == "heavy"
+
+def test_blank_and_blurred_images_are_rejected():
+    blank = np.full((600, 400, 3), 255, dtype=np.uint8)
+    assert triage(quality_metrics(blank)) == "reject"
+
+    blurred = cv2.GaussianBlur(_synthetic_receipt(), (61, 61), 25)
+    assert triage(quality_metrics(blurred)) == "reject"
+
+def test_low_receipt_score_is_rejected():
+    metrics = quality_metrics(_synthetic_receipt())
+    assert triage(metrics, score=0.1) == "reject"
+    assert triage(metrics, score=0.9) == "light"
+    assert triage(metrics, score=0.1, thresholds=TriageThresholds(min_receipt_score=0.0)) == "light"
+
+@pytest.mark.parametrize("detections, expected", [
+    ([], 0.0),
+    ([{"label": "total", "confidence": 0.7}], 0.7),
+    ([{"label": "total", "confidence": 0.7}, {"label": "receipt", "confidence": 0.4}], 0.4),
+])
+def test_receipt_score(detections, expected):
+    assert receipt_score(detections) == expected
+
+def test_route_config():
+    config = PipelineConfig(psm_modes=[6, 11])
+    light = route_config("light", config)
+    assert light.psm_modes == [6]
+    assert light.blur_kernel == 0
+    assert light.max_side == LIGHT_MAX_SIDE
+    assert route_config("light", PipelineConfig(max_side=1000)).max_side == 1000
+    assert route_config("heavy", config) is config
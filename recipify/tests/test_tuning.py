@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from recipify import tuning
+from recipify.config.pipeline import PipelineConfig
+from recipify.tuning import (
+    GroundTruth,
+    TrialResult,
+    candidate_configs,
+    evaluate,
+    load_ground_truth,
+    pareto_front,
+    score_text,
+    select_config,
+)
+
+DATASET_DIR = Path(__file__).resolve().parents[2] / "dataset"
+
+def _result(latency, accuracy):
+    return TrialResult(
+        config=PipelineConfig(),
+        accuracy={"total": accuracy, "date": accuracy, "vendor": accuracy},
+        latency=latency,
+    )
+
+def test_pipeline_config_round_trip(tmp_path):
+    config = PipelineConfig(blur_kernel=5, threshold="adaptive", max_side=1000, psm_modes=[4])
+    path = tmp_path / "config.json"
+    config.save(path)
+    assert PipelineConfig.load(path) == config
+
+def test_pipeline_config_validation():
+    with pytest.raises(ValueError):
+        PipelineConfig(blur_kernel=4)
+    with pytest.raises(ValueError):
+        PipelineConfig(threshold="sauvola")
+
+def test_load_ground_truth():
+    truths = load_ground_truth(DATASET_DIR / "annotations.xml", [DATASET_DIR / "train" / "images"])
+    by_name = {Path(t.image_path).name: t.fields for t in truths}
+    assert by_name["0.jpg"] == {"vendor": "WALMART", "total": "5.11", "date": "08/20/10"}
+
+def test_score_text():
+    truth = GroundTruth(image_path="0.jpg", fields={"vendor": "WALMART", "total": "5.11"})
+    assert score_text("Walmart\nTOTAL  5,11", truth) == {"total": True, "date": None, "vendor": True}
+    assert score_text("", truth) == {"total": False, "date": None, "vendor": False}
+
+@pytest.mark.parametrize("text", ["TOTAL 15.11", "TOTAL 5.119", "TOTAL 25,11"])
+def test_score_text_matches_whole_amounts(text):
+    truth = GroundTruth(image_path="0.jpg", fields={"total": "5.11"})
+    assert score_text(text, truth)["total"] is False
+
+def test_score_text_matches_whole_words():
+    truth = GroundTruth(image_path="0.jpg", fields={"vendor": "WALMART", "date": "08/20/10"})
+    assert score_text("WALMARTS 108/20/10", truth) == {"total": None, "date": False, "vendor": False}
+    assert score_text("WALMART 08/20/10 12:34", truth) == {"total": None, "date": True, "vendor": True}
+
+def test_evaluate_ignores_unannotated_fields(monkeypatch):
+    monkeypatch.setattr(tuning, "preprocess_image", lambda path, config: path)
+    monkeypatch.setattr(tuning, "extract_text", lambda image, config: "WALMART TOTAL 5.11")
+    truths = [GroundTruth(image_path="0.jpg", fields={"vendor": "WALMART", "total": "5.11"})]
+    result = evaluate(PipelineConfig(), truths)
+    assert result.accuracy == {"total": 1.0, "vendor": 1.0}
+    assert result.mean_accuracy == 1.0
+
+def test_candidate_configs():
+    configs = candidate_configs({"blur_kernel": [0, 3], "psm_modes": [[6], [6, 11]]})
+    assert len(configs) == 4
+    assert PipelineConfig(blur_kernel=3, psm_modes=[6, 11]) in configs
+
+def test_pareto_front_and_selection():
+    slow_good = _result(2.0, 0.9)
+    fast_ok = _result(0.5, 0.7)
+    dominated = _result(1.0, 0.6)
+    front = pareto_front([slow_good, dominated, fast_ok])
+    assert front == [fast_ok, slow_good]
+    assert select_config(front, 0.6) is fast_ok
+    assert select_config(front, 0.8) is slow_good
+    assert select_config(front, 0.95) is slow_good
@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import struct
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Each segment starts with a signed 64-bit reference count, followed by the
+# image data.
+HEADER_FORMAT = "q"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+@dataclass(frozen=True)
+class ImageHandle:
+    """Picklable reference to an image held in shared memory."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+class SharedImageTransport:
+    """
+    Pass NumPy images between pipeline processes without pickling them.
+
+    ``put`` copies an image into a new shared-memory segment once and returns
+    a small ``ImageHandle`` that is cheap to send through a queue. Consumers
+    ``attach`` to get a zero-copy array view and ``release`` when done; the
+    segment is unlinked when the last of its ``refs`` consumers releases it.
+
+    The transport must be created in the parent process and handed to the
+    workers when they are started, so they all share its lock and its
+    registry of live segments.
+    """
+
+    def __init__(self):
+        # Start the resource tracker before any worker is forked so every
+        # process shares it; otherwise each worker's own tracker would treat
+        # segments unlinked elsewhere as leaked.
+        resource_tracker.ensure_running()
+        self._lock = multiprocessing.Lock()
+        # Names of segments not yet fully released, whichever process created
+        # them, so ``cleanup`` in the parent also finds worker-created ones.
+        self._manager = multiprocessing.Manager()
+        self._live = self._manager.dict()
+        self._attached: Dict[str, shared_memory.SharedMemory] = {}
+        self._deferred: List[shared_memory.SharedMemory] = []
+
+    def __getstate__(self):
+        # Attached mappings are per process; workers start with none.
+        return {"_lock": self._lock, "_live": self._live}
+
+    def __setstate__(self, state):
+        self._lock = state["_lock"]
+        self._live = state["_live"]
+        self._attached = {}
+        self._deferred = []
+
+    def put(self, image: np.ndarray, refs: int = 1) -> ImageHandle:
+        """
+        Copy an image into shared memory.
+
+        Args:
+            image: Image to share.
+            refs: Number of consumers that will each call ``release``.
+
+        Returns:
+            ImageHandle: Handle to send to the consumers.
+        """
+        if refs < 1:
+            raise ValueError(f"refs must be at least 1, got {refs}")
+
+        image = np.ascontiguousarray(image)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + max(image.nbytes, 1))
+        self._live[shm.name] = refs
+        struct.pack_into(HEADER_FORMAT, shm.buf, 0, refs)
+        view = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf, offset=HEADER_SIZE)
+        view[...] = image
+        del view
+        shm.close()
+
+        return ImageHandle(name=shm.name, shape=image.shape, dtype=image.dtype.str)
+
+    def attach(self, handle: ImageHandle) -> np.ndarray:
+        """
+        Map a shared image into this process.
+
+        The returned array is a view of the segment and must not be used
+        after ``release`` is called for the same handle.
+        """
+        shm = self._attached.get(handle.name)
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=handle.name)
+            self._attached[handle.name] = shm
+        return np.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf, offset=HEADER_SIZE)
+
+    def release(self, handle: ImageHandle) -> int:
+        """
+        Drop one reference to a shared image.
+
+        Args:
+            handle: Handle previously returned by ``put``.
+
+        Returns:
+            int: References left; the segment is unlinked when this reaches 0.
+        """
+        shm = self._attached.pop(handle.name, None)
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=handle.name)
+
+        with self._lock:
+            (refs,) = struct.unpack_from(HEADER_FORMAT, shm.buf, 0)
+            refs -= 1
+            struct.pack_into(HEADER_FORMAT, shm.buf, 0, refs)
+            if refs == 0:
+                shm.unlink()
+                self._live.pop(handle.name, None)
+
+        self._deferred.append(shm)
+        self._close_deferred()
+        return refs
+
+    def _close_deferred(self) -> None:
+        # A mapping cannot be closed while an array view of it is alive, e.g.
+        # when an exception traceback still references the attached image.
+        # Such mappings are retried on later releases instead of failing.
+        still_open = []
+        for shm in self._deferred:
+            try:
+                shm.close()
+            except BufferError:
+                still_open.append(shm)
+        self._deferred = still_open
+
+    def cleanup(self) -> int:
+        """
+        Unlink segments that were never fully released.
+
+        This covers segments put by any process sharing the transport. Call
+        it once the pipeline has stopped, e.g. after a worker crashed holding
+        references.
+
+        Returns:
+            int: Number of leaked segments removed.
+        """
+        self._close_deferred()
+        leaked = 0
+        for name in self._live.keys():
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                continue
+            shm.close()
+            shm.unlink()
+            leaked += 1
+        self._live.clear()
+        if leaked:
+            logger.warning(f"Removed {leaked} leaked shared image segments")
+        return leaked
@@ -0,0 +1,148 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from recipify.config.pipeline import PipelineConfig
+from recipify.profiling import profiled_stage
+
+logger = logging.getLogger(__name__)
+
+ROUTES = ("reject", "light", "heavy")
+
+@dataclass(frozen=True)
+class TriageThresholds:
+    """Metric limits used to route an image before OCR."""
+    # Below any of these the image is rejected as hopeless.
+    min_blur: float = 15.0
+    min_contrast: float = 12.0
+    min_text_density: float = 0.005
+    max_text_density: float = 0.85
+    min_receipt_score: float = 0.25
+    # Images at or above all of these take the light path.
+    light_blur: float = 150.0
+    light_contrast: float = 40.0
+    light_max_skew: float = 2.0
+
+SKEW_ANGLES = np.arange(-10.0, 10.5, 1.0)
+
+# Long side clean images are downscaled to on the light path.
+LIGHT_MAX_SIDE = 1600
+
+def _estimate_skew(ink: np.ndarray) -> float:
+    """
+    Estimate text angle with a projection profile.
+
+    Text lines produce sharp peaks in the row sums of the ink mask when they
+    are horizontal, so the rotation with the highest row-sum variance is
+    taken as the skew.
+    """
+    h, w = ink.shape
+    center = (w / 2, h / 2)
+    best_angle, best_score = 0.0, -1.0
+    for angle in SKEW_ANGLES:
+        matrix = cv2.getRotationMatrix2D(center, float(angle), 1.0)
+        rotated = cv2.warpAffine(ink, matrix, (w, h), flags=cv2.INTER_NEAREST)
+        score = float(rotated.sum(axis=1, dtype=np.float64).var())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+@profiled_stage("triage")
+def quality_metrics(image: np.ndarray, max_side: int = 512) -> Dict[str, float]:
+    """
+    Compute cheap image-quality metrics on a downsampled grayscale copy.
+
+    Args:
+        image: Decoded BGR or grayscale image.
+        max_side: Long side of the copy the metrics are computed on.
+
+    Returns:
+        dict: ``blur`` (variance of the Laplacian, higher is sharper),
+        ``contrast`` (gray-level standard deviation), ``text_density``
+        (fraction of dark pixels after Otsu thresholding) and ``skew``
+        (estimated text angle in degrees, within +/-10).
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    scale = max_side / max(gray.shape[:2])
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    blur = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    contrast = float(gray.std())
+
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    text_density = float(np.count_nonzero(ink)) / ink.size
+
+    skew = _estimate_skew(ink)
+
+    return {
+        "blur": blur,
+        "contrast": contrast,
+        "text_density": text_density,
+        "skew": skew,
+    }
+
+def receipt_score(detections: List[dict]) -> float:
+    """
+    Return how confident the detector is that the image is a receipt.
+
+    This is the highest ``receipt`` confidence among YOLO detections. Models
+    trained on the bundled annotations never emit that class (receipts are
+    polygons there and only boxes are exported), so without any ``receipt``
+    box the strongest detection of any receipt element is used instead.
+    """
+    receipts = [d["confidence"] for d in detections if d.get("label") == "receipt"]
+    if receipts:
+        return max(receipts)
+    return max((d["confidence"] for d in detections), default=0.0)
+
+def triage(
+    metrics: Dict[str, float],
+    score: Optional[float] = None,
+    thresholds: TriageThresholds = TriageThresholds(),
+) -> str:
+    """
+    Choose how an image should be processed.
+
+    Args:
+        metrics: Output of ``quality_metrics``.
+        score: Optional YOLO ``receipt`` confidence, see ``receipt_score``.
+        thresholds: Limits for each route.
+
+    Returns:
+        str: ``"reject"`` for inputs OCR cannot read, ``"light"`` for clean
+        inputs and ``"heavy"`` for everything else.
+    """
+    if (
+        metrics["blur"] < thresholds.min_blur
+        or metrics["contrast"] < thresholds.min_contrast
+        or not thresholds.min_text_density <= metrics["text_density"] <= thresholds.max_text_density
+        or (score is not None and score < thresholds.min_receipt_score)
+    ):
+        return "reject"
+
+    if (
+        metrics["blur"] >= thresholds.light_blur
+        and metrics["contrast"] >= thresholds.light_contrast
+        and abs(metrics["skew"]) <= thresholds.light_max_skew
+    ):
+        return "light"
+
+    return "heavy"
+
+def route_config(route: str, config: PipelineConfig, light_max_side: int = LIGHT_MAX_SIDE) -> PipelineConfig:
+    """
+    Return the preprocessing and OCR configuration for a route.
+
+    Images on the light path are already sharp and high-contrast, so they
+    are preprocessed without blurring at no more than ``light_max_side``
+    pixels and read with only the first PSM mode. The heavy path keeps the
+    configuration unchanged, with every configured mode as a fallback.
+    """
+    if route == "light":
+        max_side = min(config.max_side or light_max_side, light_max_side)
+        return config.copy(update={"psm_modes": config.psm_modes[:1], "blur_kernel": 0, "max_side": max_side})
+    return config
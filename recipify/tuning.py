@@ -0,0 +1,268 @@
+import argparse
+import itertools
+import logging
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from recipify.config.pipeline import PipelineConfig
+from recipify.ocr import extract_text
+from recipify.preprocessing import preprocess_image
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("total", "date", "vendor")
+
+# Every combination of these values is evaluated by ``tune``.
+SEARCH_SPACE = {
+    "blur_kernel": [0, 3, 5],
+    "threshold": ["otsu", "adaptive", "none"],
+    "close_kernel": [1, 2],
+    "max_side": [None, 1600, 1000],
+    "psm_modes": [[6], [11], [4], [6, 11]],
+}
+
+# Bounded so that "5.11" is not found inside "15.11" or "5.119".
+AMOUNT_PATTERN = re.compile(r"(?<![\d.,])\d+[.,]\d{2}(?![\d.,]?\d)")
+DATE_PATTERN = re.compile(r"(?<!\d)\d{1,4}[/.\-]\d{1,2}[/.\-]\d{2,4}(?!\d)")
+
+@dataclass
+class TrialResult:
+    """Accuracy and latency of one configuration over the ground-truth set."""
+    config: PipelineConfig
+    accuracy: Dict[str, float]
+    latency: float
+    errors: int = 0
+
+    @property
+    def mean_accuracy(self) -> float:
+        if not self.accuracy:
+            return 0.0
+        return sum(self.accuracy.values()) / len(self.accuracy)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": self.config.dict(),
+            "accuracy": self.accuracy,
+            "mean_accuracy": self.mean_accuracy,
+            "latency": self.latency,
+            "errors": self.errors,
+        }
+
+@dataclass
+class GroundTruth:
+    """Expected field values for one annotated receipt image."""
+    image_path: str
+    fields: Dict[str, str] = field(default_factory=dict)
+
+def _normalize(text: str) -> str:
+    """Uppercase and collapse whitespace so OCR spacing does not matter."""
+    return " ".join(text.upper().split())
+
+def load_ground_truth(xml_path: str, image_dirs: Iterable[str]) -> List[GroundTruth]:
+    """
+    Read expected total, date and vendor values from CVAT annotations.
+
+    Only images present in one of ``image_dirs`` are returned, so pointing
+    this at the validation split gives a held-out evaluation set.
+
+    Args:
+        xml_path: Path to the annotations.xml file.
+        image_dirs: Directories searched for the annotated images.
+
+    Returns:
+        list[GroundTruth]: One entry per image with at least one labelled field.
+    """
+    image_dirs = list(image_dirs)
+    root = ET.parse(xml_path).getroot()
+
+    truths = []
+    for image in root.findall("image"):
+        name = os.path.basename(image.get("name"))
+        image_path = next(
+            (os.path.join(d, name) for d in image_dirs if os.path.exists(os.path.join(d, name))),
+            None,
+        )
+        if image_path is None:
+            continue
+
+        fields = {}
+        for box in image.findall("box"):
+            attribute = box.find("attribute[@name='text']")
+            if attribute is None or not attribute.text:
+                continue
+            label = box.get("label")
+            if label == "shop":
+                fields["vendor"] = _normalize(attribute.text)
+            elif label == "total":
+                amounts = AMOUNT_PATTERN.findall(attribute.text)
+                if amounts:
+                    fields["total"] = amounts[-1].replace(",", ".")
+            elif label == "date_time":
+                date_match = DATE_PATTERN.search(attribute.text)
+                if date_match:
+                    fields["date"] = date_match.group(0)
+
+        if fields:
+            truths.append(GroundTruth(image_path=image_path, fields=fields))
+
+    return truths
+
+def score_text(text: str, truth: GroundTruth) -> Dict[str, Optional[bool]]:
+    """
+    Check which ground-truth fields were recovered by OCR.
+
+    The total and date count as recovered when one of the amounts or dates
+    found in the text equals the expected value, so a total of ``5.11`` is
+    not matched by ``15.11``. The vendor must appear as whole words. Fields
+    missing from the annotations are ``None``.
+    """
+    normalized = _normalize(text)
+    found = {
+        "total": {amount.replace(",", ".") for amount in AMOUNT_PATTERN.findall(normalized)},
+        "date": set(DATE_PATTERN.findall(normalized)),
+    }
+
+    scores: Dict[str, Optional[bool]] = {}
+    for name in FIELDS:
+        expected = truth.fields.get(name)
+        if expected is None:
+            scores[name] = None
+        elif name in found:
+            scores[name] = expected in found[name]
+        else:
+            scores[name] = re.search(rf"(?<!\w){re.escape(expected)}(?!\w)", normalized) is not None
+    return scores
+
+def evaluate(config: PipelineConfig, truths: List[GroundTruth]) -> TrialResult:
+    """
+    Run preprocessing and OCR with ``config`` over every ground-truth image.
+
+    Args:
+        config: Configuration to evaluate.
+        truths: Annotated images to run on.
+
+    Returns:
+        TrialResult: Accuracy of each field annotated on at least one image,
+        and mean seconds per image.
+    """
+    hits = {name: 0 for name in FIELDS}
+    counts = {name: 0 for name in FIELDS}
+    elapsed = 0.0
+    errors = 0
+
+    for truth in truths:
+        start = time.perf_counter()
+        try:
+            text = extract_text(preprocess_image(truth.image_path, config), config)
+        except RuntimeError as e:
+            logger.warning(f"{truth.image_path} failed with {config}: {e}")
+            text = ""
+            errors += 1
+        elapsed += time.perf_counter() - start
+
+        for name, hit in score_text(text, truth).items():
+            if hit is not None:
+                counts[name] += 1
+                hits[name] += hit
+
+    accuracy = {name: hits[name] / counts[name] for name in FIELDS if counts[name]}
+    return TrialResult(
+        config=config,
+        accuracy=accuracy,
+        latency=elapsed / max(len(truths), 1),
+        errors=errors,
+    )
+
+def candidate_configs(search_space: Dict[str, List[Any]] = SEARCH_SPACE) -> List[PipelineConfig]:
+    """Expand a search space into every configuration it describes."""
+    keys = list(search_space)
+    return [
+        PipelineConfig(**dict(zip(keys, values)))
+        for values in itertools.product(*(search_space[key] for key in keys))
+    ]
+
+def pareto_front(results: List[TrialResult]) -> List[TrialResult]:
+    """
+    Keep the results not dominated on (latency, mean accuracy).
+
+    Returns:
+        list[TrialResult]: The front, fastest first.
+    """
+    front = []
+    best_accuracy = -1.0
+    for result in sorted(results, key=lambda r: (r.latency, -r.mean_accuracy)):
+        if result.mean_accuracy > best_accuracy:
+            front.append(result)
+            best_accuracy = result.mean_accuracy
+    return front
+
+def select_config(front: List[TrialResult], target_accuracy: float) -> TrialResult:
+    """
+    Pick the fastest configuration that meets the accuracy target.
+
+    Falls back to the most accurate configuration if none meets it.
+    """
+    for result in front:
+        if result.mean_accuracy >= target_accuracy:
+            return result
+    return front[-1]
+
+def tune(
+    annotations_path: str,
+    image_dirs: Iterable[str],
+    target_accuracy: float,
+    search_space: Dict[str, List[Any]] = SEARCH_SPACE,
+) -> List[TrialResult]:
+    """
+    Evaluate every configuration in the search space.
+
+    Args:
+        annotations_path: Path to the annotations.xml file.
+        image_dirs: Directories with the held-out receipt images.
+        target_accuracy: Mean field accuracy the selected config must reach.
+        search_space: Values to sweep for each PipelineConfig field.
+
+    Returns:
+        list[TrialResult]: The Pareto front, fastest first.
+    """
+    truths = load_ground_truth(annotations_path, image_dirs)
+    if not truths:
+        raise ValueError(f"No annotated images found in {list(image_dirs)}")
+
+    configs = candidate_configs(search_space)
+    print(f"Evaluating {len(configs)} configurations on {len(truths)} receipts...")
+
+    results = []
+    for i, config in enumerate(configs, 1):
+        result = evaluate(config, truths)
+        print(f"[{i}/{len(configs)}] accuracy={result.mean_accuracy:.2f} "
+              f"latency={result.latency:.3f}s {config.dict()}")
+        results.append(result)
+
+    return pareto_front(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune preprocessing and OCR settings")
+    parser.add_argument("--annotations", type=str, default="dataset/annotations.xml", help="Path to annotations.xml")
+    parser.add_argument("--images", type=str, nargs="+", default=["dataset/val/images"], help="Directories with held-out receipt images")
+    parser.add_argument("--target-accuracy", type=float, default=0.8, help="Mean field accuracy the chosen config must reach")
+    parser.add_argument("--output", type=str, default="pipeline_config.json", help="Where to write the selected config")
+    args = parser.parse_args()
+
+    front = tune(args.annotations, args.images, args.target_accuracy)
+
+    print("\nPareto front (fastest first):")
+    for result in front:
+        accuracy = " ".join(f"{name}={value:.2f}" for name, value in result.accuracy.items())
+        print(f"- {result.latency:.3f}s/receipt {accuracy} {result.config.dict()}")
+
+    selected = select_config(front, args.target_accuracy)
+    selected.config.save(args.output)
+    print(f"\nSelected config saved at {args.output}")
+
+if __name__ == "__main__":
+    main()